@@ -4,10 +4,18 @@ Performs root cause analysis and incident detection using Amazon Bedrock
 """
 
 import asyncio
+import bisect
+import hashlib
+import heapq
+import itertools
 import json
 import logging
+import re
+import time
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from .base_agent import BaseAgent
 from models import Incident, LogEntry, AgentMessage, MessageType
@@ -16,6 +24,33 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of log entries forwarded to Bedrock per analysis
+_MAX_LOG_LINES = 50
+
+# Deduplication scans at most this many entries per batch
+_MAX_DEDUP_SCAN = 5000
+
+# Variable parts (timestamps, UUIDs, bare numbers) replaced before
+# deduplication so message variants collapse into one line
+_LINE_NORM_RE = re.compile(
+    r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?'
+    r'|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    r'|\b\d+\b'
+)
+
+# Log levels that count towards a service's error rate
+_ERROR_LEVELS = frozenset(('ERROR', 'FATAL'))
+
+# Severity bands over error rate: <0.15 low, <0.3 medium, <0.5 high, else critical
+_SEVERITY_THRESHOLDS = (0.15, 0.30, 0.50)
+_SEVERITY_LABELS = ('low', 'medium', 'high', 'critical')
+
+
+def _normalize_log_line(entry: Dict) -> str:
+    """Format a log entry for the Bedrock prompt with variable parts masked"""
+    line = f"{entry.get('level', '')} {entry.get('service', '')} {entry.get('message', '')}"
+    return _LINE_NORM_RE.sub('<*>', line)
+
 
 class AnalyzerAgent(BaseAgent):
     """
@@ -29,18 +64,55 @@ class AnalyzerAgent(BaseAgent):
             agent_type="analysis", 
             capabilities=["log_analysis", "incident_detection", "root_cause_analysis"]
         )
-        self.bedrock_client = get_bedrock_client()
+        # Bedrock client construction can block on credential/IAM lookups,
+        # so it is deferred to initialize() (lazy for non-started use)
+        self._bedrock_client = None
+        self._bedrock_available: Optional[bool] = None
         self.active_incidents: Dict[str, Incident] = {}
-        self.analysis_history: List[Dict] = []
+        # Secondary index: status -> incident ids, so status-filtered queries
+        # don't scan every Incident object in the identity map
+        self._status_index: Dict[str, set] = defaultdict(set)
+        # Bounded ring buffer - the agent is long-running and an unbounded
+        # list would grow with every analysis
+        self.analysis_history: deque = deque(maxlen=1000)
+
+        # Micro-batching of Bedrock log-analysis calls (started in initialize())
+        self._analysis_queue: Optional[asyncio.Queue] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+        self._batch_max_size = 16
+        self._batch_window_seconds = 0.05
+
+        # Incident-ID generation: cached second-resolution prefix + counter
+        # (strftime per incident is expensive and could collide within a second)
+        self._id_counter = itertools.count()
+        self._id_prefix = (0, "")
+
+        # Min-heap of (resolved_at, incident_id) so cleanup only touches
+        # incidents that are actually due for expiry
+        self._resolved_heap: List[Tuple[datetime, str]] = []
+
+        # Root-cause analyses keyed by input fingerprint; repeat requests
+        # within the TTL skip the Bedrock round-trip entirely
+        self._rca_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._rca_cache_ttl = 300.0
         
         # Detection thresholds from config
         self.error_rate_threshold = 0.15
         self.response_time_threshold = 5000
         self.availability_threshold = 0.95
         self.detection_window_minutes = 5
-        
-        logger.info(f"Analyzer Agent initialized with Bedrock: {self.bedrock_client.is_available()}")
-    
+
+        # Batches above this size run pattern detection in a worker thread
+        # so the event loop (heartbeat, other agents) stays responsive
+        self.pattern_offload_threshold = 1000
+
+    @property
+    def bedrock_client(self):
+        """Bedrock client, constructed lazily when the agent wasn't start()ed"""
+        if self._bedrock_client is None:
+            self._bedrock_client = get_bedrock_client()
+        return self._bedrock_client
+
     async def process_message(self, message: AgentMessage) -> Optional[AgentMessage]:
         """Process incoming messages for analysis requests"""
         try:
@@ -56,7 +128,11 @@ class AnalyzerAgent(BaseAgent):
                         recipient_id="broadcast",
                         message_type=MessageType.INCIDENT_DETECTED,
                         data={
-                            'incidents': [incident.model_dump() for incident in incidents],
+                            # mode='json' serializes datetimes etc. in
+                            # pydantic-core, so the broadcast payload is plain
+                            # JSON-ready primitives and downstream encoders
+                            # never need a default=str fallback per incident
+                            'incidents': [incident.model_dump(mode='json') for incident in incidents],
                             'analysis_timestamp': datetime.utcnow().isoformat()
                         },
                         timestamp=datetime.utcnow()
@@ -64,18 +140,21 @@ class AnalyzerAgent(BaseAgent):
                     return response
                     
             elif message.message_type == MessageType.ROOT_CAUSE_REQUEST:
-                # Perform root cause analysis
+                # Perform root cause analysis. Validate the payload into a
+                # typed Incident once (pydantic-core is C-level) so downstream
+                # code uses attribute access instead of repeated dict lookups
                 incident_data = message.data.get('incident')
                 if incident_data:
-                    root_cause = await self.perform_root_cause_analysis(incident_data)
-                    
+                    incident = Incident.model_validate(incident_data)
+                    root_cause = await self.perform_root_cause_analysis(incident)
+
                     response = AgentMessage(
                         sender_id=self.agent_id,
                         recipient_id=message.sender_id,
                         message_type=MessageType.ANALYSIS_RESULT,
                         data={
                             'root_cause_analysis': root_cause,
-                            'incident_id': incident_data.get('id')
+                            'incident_id': incident.id
                         },
                         timestamp=datetime.utcnow()
                     )
@@ -88,50 +167,184 @@ class AnalyzerAgent(BaseAgent):
     async def analyze_logs_for_incidents(self, log_data: Dict) -> List[Incident]:
         """Analyze log data for potential incidents using Bedrock AI"""
         logger.info("Analyzing logs for incidents using Bedrock AI")
-        
+
         try:
-            log_entries = log_data.get('log_entries', [])
-            anomalies = log_data.get('anomalies', [])
-            
-            if not log_entries:
-                return []
-            
-            # Use Bedrock to analyze logs
-            log_text = [f"{entry.get('timestamp', '')} {entry.get('level', '')} {entry.get('service', '')} {entry.get('message', '')}" 
-                       for entry in log_entries[:50]]  # Limit for API efficiency
-            
-            analysis_result = await self.bedrock_client.analyze_logs(
-                log_text, 
-                context=f"Analyzing {len(log_entries)} log entries with {len(anomalies)} detected anomalies"
-            )
-            
-            incidents = []
-            
-            # Process Bedrock analysis results
-            bedrock_incidents = analysis_result.get('incidents', [])
-            
-            for bedrock_incident in bedrock_incidents:
-                incident = self._create_incident_from_analysis(bedrock_incident, log_entries, anomalies)
-                if incident:
-                    incidents.append(incident)
-                    self.active_incidents[incident.id] = incident
-            
-            # Also check for pattern-based incidents (fallback)
-            pattern_incidents = await self.detect_incidents_by_patterns(log_entries, anomalies)
-            incidents.extend(pattern_incidents)
-            
-            logger.info(f"Detected {len(incidents)} incidents from log analysis")
+            incidents = [incident async for incident in self.stream_incidents_from_logs(log_data)]
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Detected %s incidents from log analysis", len(incidents))
             return incidents
-            
+
         except Exception as e:
             logger.error(f"Error in log analysis: {e}")
             # Fallback to pattern-based detection
             return await self.detect_incidents_by_patterns(log_data.get('log_entries', []), log_data.get('anomalies', []))
+
+    async def stream_incidents_from_logs(self, log_data: Dict) -> AsyncIterator[Incident]:
+        """Yield incidents as each analysis source completes
+
+        The Bedrock call and the pattern-based fallback still run
+        concurrently, but incidents are emitted as soon as either side
+        finishes - pattern incidents are typically available well before
+        the Bedrock round-trip completes, cutting time-to-first-incident
+        for streaming consumers. A failure on one side only loses that
+        side's incidents.
+        """
+        log_entries = log_data.get('log_entries', [])
+        anomalies = log_data.get('anomalies', [])
+
+        if not log_entries:
+            return
+
+        # Fast path for healthy traffic: no error-level logs and no anomalies
+        # means there is nothing for either analysis source to find, so skip
+        # the Bedrock round-trip entirely. any() short-circuits on first hit.
+        if not anomalies and not any(
+            entry.get('level') in _ERROR_LEVELS for entry in log_entries
+        ):
+            logger.debug("No error-level logs or anomalies - skipping analysis")
+            return
+
+        # Deduplicate repeated messages with multiplicity annotations so the
+        # prompt carries the whole batch's signal in at most _MAX_LOG_LINES
+        # lines - duplicate lines only waste Bedrock tokens. islice avoids
+        # copying the batch just to cap the scan.
+        line_counts = Counter(map(_normalize_log_line, islice(log_entries, _MAX_DEDUP_SCAN)))
+        log_text = [f"{line} (x{count})" for line, count in line_counts.most_common(_MAX_LOG_LINES)]
+        context = f"Analyzing {len(log_entries)} log entries with {len(anomalies)} detected anomalies"
+
+        bedrock_task = asyncio.create_task(self._analyze_logs_batched(log_text, context))
+        pattern_task = asyncio.create_task(self.detect_incidents_by_patterns(log_entries, anomalies))
+
+        pending = {bedrock_task, pattern_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as e:
+                    source = 'Bedrock analysis' if task is bedrock_task else 'Pattern-based detection'
+                    logger.error(f"{source} failed: {e}")
+                    continue
+
+                if task is bedrock_task:
+                    for bedrock_incident in result.get('incidents', []):
+                        incident = self._create_incident_from_analysis(bedrock_incident, log_entries, anomalies)
+                        if incident:
+                            self._register_incident(incident)
+                            yield incident
+                else:
+                    for incident in result:
+                        yield incident
     
+    async def _analyze_logs_batched(self, log_text: List[str], context: str) -> Dict:
+        """Submit a log-analysis request, coalescing with concurrent requests
+
+        When the batcher is running (after initialize()), requests arriving
+        within the batch window share a single Bedrock invocation. Falls back
+        to a direct call when the agent is used without start().
+        """
+        if self._analysis_queue is None:
+            return await self.bedrock_client.analyze_logs(log_text, context=context)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._analysis_queue.put((log_text, context, future))
+        return await future
+
+    async def _bedrock_batcher(self):
+        """Background task that coalesces queued log-analysis requests
+
+        Drains up to _batch_max_size requests (waiting at most
+        _batch_window_seconds for stragglers), issues one Bedrock call for
+        the combined log text and resolves each caller's future with its
+        own slice of the result. Requests are separated with REQ markers
+        and the model is asked to tag each incident with the block it
+        came from.
+        """
+        while True:
+            batch = [await self._analysis_queue.get()]
+
+            while len(batch) < self._batch_max_size:
+                try:
+                    batch.append(await asyncio.wait_for(
+                        self._analysis_queue.get(),
+                        timeout=self._batch_window_seconds
+                    ))
+                except asyncio.TimeoutError:
+                    break
+
+            if len(batch) == 1:
+                log_text, context, future = batch[0]
+                combined_text, combined_context = log_text, context
+            else:
+                combined_text = []
+                for i, (log_text, _, _) in enumerate(batch):
+                    combined_text.append(f"### REQ {i} ###")
+                    combined_text.extend(log_text)
+                combined_context = f"Batched analysis of {len(batch)} log sets: " + \
+                    "; ".join(context for _, context, _ in batch) + \
+                    '. Tag every incident with "req_index": the number of ' \
+                    'the ### REQ n ### block its evidence came from.'
+
+            try:
+                analysis_result = await self.bedrock_client.analyze_logs(
+                    combined_text,
+                    context=combined_context
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                if len(batch) == 1:
+                    results = [analysis_result]
+                else:
+                    logger.info(f"Served {len(batch)} log-analysis requests with one Bedrock call")
+                    results = self._demux_batched_result(analysis_result, batch)
+                for (_, _, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    @staticmethod
+    def _demux_batched_result(analysis_result: Dict, batch: List) -> List[Dict]:
+        """Split a combined batched analysis back into per-request results
+
+        Incidents are routed by the req_index the batched prompt asks the
+        model to attach. Incidents without a usable tag are attributed to
+        the single request whose log text shares the most words with the
+        incident, so nothing is duplicated across callers or dropped.
+        """
+        incidents_by_req = [[] for _ in batch]
+        request_words = None
+
+        for incident in analysis_result.get('incidents', []):
+            idx = incident.pop('req_index', None)
+            if not (isinstance(idx, int) and 0 <= idx < len(batch)):
+                if request_words is None:
+                    request_words = [
+                        set(re.findall(r'\w+', ' '.join(log_text).lower()))
+                        for log_text, _, _ in batch
+                    ]
+                incident_words = set(re.findall(
+                    r'\w+',
+                    f"{incident.get('title', '')} {incident.get('description', '')}".lower()))
+                idx = max(range(len(batch)),
+                          key=lambda i: len(incident_words & request_words[i]))
+            incidents_by_req[idx].append(incident)
+
+        return [dict(analysis_result, incidents=incidents)
+                for incidents in incidents_by_req]
+
+    def _new_incident_id(self, suffix: str) -> str:
+        """Generate a unique incident ID without a per-call strftime"""
+        now = int(time.time())
+        if now != self._id_prefix[0]:
+            self._id_prefix = (now, time.strftime('%Y%m%d%H%M%S', time.gmtime(now)))
+        return f"inc-{self._id_prefix[1]}-{next(self._id_counter)}-{suffix}"
+
     def _create_incident_from_analysis(self, bedrock_incident: Dict, log_entries: List, anomalies: List) -> Optional[Incident]:
         """Create an Incident object from Bedrock analysis"""
         try:
-            incident_id = f"inc-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{len(self.active_incidents)}"
+            incident_id = self._new_incident_id('ai')
             
             incident = Incident(
                 id=incident_id,
@@ -152,41 +365,55 @@ class AnalyzerAgent(BaseAgent):
             return None
     
     async def detect_incidents_by_patterns(self, log_entries: List, anomalies: List) -> List[Incident]:
-        """Fallback pattern-based incident detection"""
+        """Fallback pattern-based incident detection
+
+        Pure CPU-bound work; large batches are offloaded to a thread so
+        they don't block the event loop.
+        """
+        if len(log_entries) > self.pattern_offload_threshold:
+            return await asyncio.to_thread(
+                self._detect_incidents_by_patterns_sync, log_entries, anomalies
+            )
+        return self._detect_incidents_by_patterns_sync(log_entries, anomalies)
+
+    def _detect_incidents_by_patterns_sync(self, log_entries: List, anomalies: List) -> List[Incident]:
         incidents = []
-        
-        # Group logs by service
-        service_logs = {}
+
+        # Count totals and errors per service in a single pass instead of
+        # grouping full log lists and re-scanning each group. dict.get and
+        # the level set are bound to locals to avoid a LOAD_METHOD/LOAD_GLOBAL
+        # per row in this hot loop.
+        total_counts = Counter()
+        error_counts = Counter()
+        get = dict.get
+        err_levels = _ERROR_LEVELS
         for entry in log_entries:
-            service = entry.get('service', 'unknown')
-            if service not in service_logs:
-                service_logs[service] = []
-            service_logs[service].append(entry)
-        
-        # Check each service for incident patterns
-        for service, logs in service_logs.items():
-            incident = await self._check_service_for_incidents(service, logs, anomalies)
+            service = get(entry, 'service', 'unknown')
+            total_counts[service] += 1
+            if get(entry, 'level') in err_levels:
+                error_counts[service] += 1
+
+        # Only services whose error rate crossed the threshold are checked;
+        # self lookups are hoisted out of the loop
+        threshold = self.error_rate_threshold
+        register = self._register_incident
+        check_service = self._check_service_for_incidents
+        for service, total_logs in total_counts.items():
+            error_rate = error_counts[service] / total_logs
+            if error_rate <= threshold:
+                continue
+            incident = check_service(service, error_rate, anomalies)
             if incident:
                 incidents.append(incident)
-                self.active_incidents[incident.id] = incident
-        
+                register(incident)
+
         return incidents
-    
-    async def _check_service_for_incidents(self, service: str, logs: List, anomalies: List) -> Optional[Incident]:
-        """Check a specific service for incident patterns"""
+
+    def _check_service_for_incidents(self, service: str, error_rate: float, anomalies: List) -> Optional[Incident]:
+        """Create an incident for a service whose error rate crossed the threshold"""
         try:
-            # Count errors in the logs
-            error_count = sum(1 for log in logs if log.get('level') in ['ERROR', 'FATAL'])
-            total_logs = len(logs)
-            
-            if total_logs == 0:
-                return None
-            
-            error_rate = error_count / total_logs
-            
-            # Check if error rate exceeds threshold
             if error_rate > self.error_rate_threshold:
-                incident_id = f"inc-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{service}"
+                incident_id = self._new_incident_id(service)
                 
                 incident = Incident(
                     id=incident_id,
@@ -203,43 +430,63 @@ class AnalyzerAgent(BaseAgent):
                 return incident
                 
         except Exception as e:
-            logger.error(f"Error checking service {service} for incidents: {e}")
+            logger.error("Error checking service %s for incidents: %s", service, e)
         
         return None
     
     def _determine_severity(self, error_rate: float) -> str:
         """Determine incident severity based on error rate"""
-        if error_rate >= 0.5:
-            return 'critical'
-        elif error_rate >= 0.3:
-            return 'high'
-        elif error_rate >= 0.15:
-            return 'medium'
-        else:
-            return 'low'
+        return _SEVERITY_LABELS[bisect.bisect_right(_SEVERITY_THRESHOLDS, error_rate)]
     
-    async def perform_root_cause_analysis(self, incident_data: Dict) -> Dict:
-        """Perform root cause analysis using Bedrock AI"""
-        logger.info(f"Performing root cause analysis for incident: {incident_data.get('id')}")
-        
+    async def _cached_root_cause_analysis(self, description: str, evidence: List[str]) -> Dict:
+        """Run Bedrock root cause analysis with a TTL cache on the inputs
+
+        Identical (description, evidence) pairs analyzed within the TTL are
+        served from memory - duplicate Bedrock queries are pure waste.
+        """
+        key = hashlib.blake2b(
+            "\0".join([description, *evidence]).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        cached = self._rca_cache.get(key)
+        if cached and time.time() - cached[0] < self._rca_cache_ttl:
+            logger.info("Root cause analysis cache hit - skipping Bedrock call")
+            return cached[1]
+
+        analysis = await self.bedrock_client.perform_root_cause_analysis(
+            incident_description=description,
+            evidence=evidence
+        )
+        self._rca_cache[key] = (time.time(), analysis)
+        return analysis
+
+    async def perform_root_cause_analysis(self, incident_data) -> Dict:
+        """Perform root cause analysis using Bedrock AI
+
+        Accepts an Incident or its dict form; dicts are validated once so
+        the rest of the method uses attribute access.
+        """
         try:
+            incident = incident_data if isinstance(incident_data, Incident) \
+                else Incident.model_validate(incident_data)
+            logger.info(f"Performing root cause analysis for incident: {incident.id}")
+
             # Prepare evidence for analysis
-            evidence = []
-            evidence.append(f"Incident: {incident_data.get('title', 'Unknown')}")
-            evidence.append(f"Description: {incident_data.get('description', 'No description')}")
-            evidence.append(f"Affected Services: {', '.join(incident_data.get('affected_services', []))}")
-            evidence.append(f"Severity: {incident_data.get('severity', 'unknown')}")
-            evidence.append(f"First Seen: {incident_data.get('first_seen', 'unknown')}")
-            
+            evidence = [
+                f"Incident: {incident.title}",
+                f"Description: {incident.description}",
+                f"Affected Services: {', '.join(incident.affected_services)}",
+                f"Severity: {incident.severity}",
+                f"First Seen: {incident.created_at}"
+            ]
+
             # Use Bedrock for root cause analysis
-            analysis = await self.bedrock_client.perform_root_cause_analysis(
-                incident_description=incident_data.get('description', ''),
-                evidence=evidence
-            )
-            
+            analysis = await self._cached_root_cause_analysis(incident.description, evidence)
+
             # Store analysis in history
             self.analysis_history.append({
-                'incident_id': incident_data.get('id'),
+                'incident_id': incident.id,
                 'analysis': analysis,
                 'timestamp': datetime.utcnow().isoformat()
             })
@@ -266,35 +513,38 @@ class AnalyzerAgent(BaseAgent):
         """Detect incidents from anomaly data"""
         incidents = []
         
-        # Group anomalies by service
-        service_anomalies = {}
-        for anomaly in anomalies:
-            service = anomaly.get('service', 'unknown')
-            if service not in service_anomalies:
-                service_anomalies[service] = []
-            service_anomalies[service].append(anomaly)
-        
-        # Create incidents for services with significant anomalies
-        for service, service_anomaly_list in service_anomalies.items():
-            high_severity_anomalies = [a for a in service_anomaly_list if a.get('severity') in ['high', 'critical']]
-            
-            if len(high_severity_anomalies) >= 2:  # Multiple high-severity anomalies
-                incident_id = f"inc-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{service}"
-                
-                incident = Incident(
+        # Filter to high-severity anomalies and count per service in a single
+        # pass; the filter runs before grouping so the grouped data is smaller
+        high_severity_counts = Counter(
+            anomaly.get('service', 'unknown')
+            for anomaly in anomalies
+            if anomaly.get('severity') in ('high', 'critical')
+        )
+
+        # Create incidents for services with significant anomalies; per-row
+        # self/global lookups are hoisted to locals
+        register = self._register_incident
+        new_incident_id = self._new_incident_id
+        utcnow = datetime.utcnow
+        make_incident = Incident
+        for service, count in high_severity_counts.items():
+            if count >= 2:  # Multiple high-severity anomalies
+                incident_id = new_incident_id(service)
+
+                incident = make_incident(
                     id=incident_id,
                     title=f"Multiple Anomalies Detected in {service}",
-                    description=f"Detected {len(high_severity_anomalies)} high-severity anomalies in {service}",
-                    severity='high' if len(high_severity_anomalies) >= 3 else 'medium',
+                    description=f"Detected {count} high-severity anomalies in {service}",
+                    severity='high' if count >= 3 else 'medium',
                     status='open',
                     affected_services=[service],
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    confidence_score=min(0.9, len(high_severity_anomalies) * 0.3)
+                    first_seen=utcnow(),
+                    last_seen=utcnow(),
+                    confidence_score=min(0.9, count * 0.3)
                 )
-                
+
                 incidents.append(incident)
-                self.active_incidents[incident.id] = incident
+                register(incident)
         
         return incidents
     
@@ -310,11 +560,8 @@ class AnalyzerAgent(BaseAgent):
                     evidence_text.append(str(item))
             
             # Use Bedrock for analysis
-            analysis = await self.bedrock_client.perform_root_cause_analysis(
-                incident_description=incident.description,
-                evidence=evidence_text
-            )
-            
+            analysis = await self._cached_root_cause_analysis(incident.description, evidence_text)
+
             return analysis
             
         except Exception as e:
@@ -326,6 +573,29 @@ class AnalyzerAgent(BaseAgent):
                 'confidence': 0.1
             }
     
+    def _register_incident(self, incident: Incident) -> None:
+        """Track a new incident in the identity map and the status index"""
+        self.active_incidents[incident.id] = incident
+        self._status_index[incident.status].add(incident.id)
+
+    def get_incidents_by_status(self, status: str) -> List[Incident]:
+        """Return active incidents with the given status via the index"""
+        return [self.active_incidents[incident_id]
+                for incident_id in self._status_index.get(status, ())
+                if incident_id in self.active_incidents]
+
+    def resolve_incident(self, incident_id: str, reason: str = "") -> bool:
+        """Mark an active incident as resolved and schedule it for cleanup"""
+        incident = self.active_incidents.get(incident_id)
+        if not incident:
+            return False
+
+        self._status_index[incident.status].discard(incident_id)
+        incident.update_status('resolved', reason)
+        self._status_index['resolved'].add(incident_id)
+        heapq.heappush(self._resolved_heap, (incident.resolved_at, incident_id))
+        return True
+
     async def get_incident_status(self, incident_id: str) -> Optional[Dict]:
         """Get status of a specific incident"""
         incident = self.active_incidents.get(incident_id)
@@ -337,8 +607,12 @@ class AnalyzerAgent(BaseAgent):
         """Main run loop for the Analyzer Agent"""
         logger.info(f"Analyzer Agent {self.agent_id} starting...")
         
-        # Test Bedrock connection
-        if self.bedrock_client.is_available():
+        # Availability was cached during initialize(); only probe the client
+        # directly if the agent was started without it
+        available = self._bedrock_available
+        if available is None:
+            available = self.bedrock_client.is_available()
+        if available:
             logger.info("Bedrock AI integration active")
         else:
             logger.warning("Bedrock AI not available - using pattern-based analysis")
@@ -364,33 +638,44 @@ class AnalyzerAgent(BaseAgent):
         logger.info(f"Analyzer Agent {self.agent_id} stopped")
     
     async def _cleanup_old_incidents(self):
-        """Clean up old resolved incidents"""
+        """Clean up old resolved incidents
+
+        Pops expired entries off the resolved-at heap instead of scanning
+        every active incident on each pass.
+        """
         try:
             cutoff_time = datetime.utcnow() - timedelta(hours=24)
-            
-            incidents_to_remove = []
-            for incident_id, incident in self.active_incidents.items():
-                if incident.status == 'resolved' and incident.resolved_at and incident.resolved_at < cutoff_time:
-                    incidents_to_remove.append(incident_id)
-            
-            for incident_id in incidents_to_remove:
-                del self.active_incidents[incident_id]
-                logger.debug(f"Cleaned up old incident: {incident_id}")
-                
+            # One level check up front instead of per popped incident
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+            while self._resolved_heap and self._resolved_heap[0][0] < cutoff_time:
+                _, incident_id = heapq.heappop(self._resolved_heap)
+                if self.active_incidents.pop(incident_id, None):
+                    self._status_index['resolved'].discard(incident_id)
+                    if debug_enabled:
+                        logger.debug("Cleaned up old incident: %s", incident_id)
+
         except Exception as e:
             logger.error(f"Error cleaning up old incidents: {e}")
     
     async def initialize(self):
         """Initialize the analyzer agent"""
-        logger.info(f"Analyzer Agent {self.agent_id} initialized")
-        # Add any initialization logic here
-        pass
-        
+        # Pre-warm the Bedrock client off the event loop so several agents
+        # can initialize in parallel without serializing on credential checks
+        self._bedrock_client = await asyncio.to_thread(get_bedrock_client)
+        self._bedrock_available = await asyncio.to_thread(self._bedrock_client.is_available)
+
+        self._analysis_queue = asyncio.Queue()
+        self._batcher_task = asyncio.create_task(self._bedrock_batcher())
+        logger.info(f"Analyzer Agent {self.agent_id} initialized with Bedrock: {self._bedrock_available}")
+
     async def cleanup(self):
         """Cleanup resources"""
         logger.info(f"Analyzer Agent {self.agent_id} cleaning up")
-        # Add any cleanup logic here
-        pass
+        if self._batcher_task:
+            self._batcher_task.cancel()
+            self._batcher_task = None
+        self._analysis_queue = None
 
 
 async def main():
@@ -4,11 +4,16 @@ Performs root cause analysis and incident detection using Amazon Bedrock
 """
 
 import asyncio
+import functools
 import json
 import logging
+import re
+import sys
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import asdict
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
 
 from .base_agent import BaseAgent
 from ..models import Incident, LogEntry, AgentMessage, MessageType
@@ -17,6 +22,129 @@ import config
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class DetectedIncident:
+    """Lightweight record for a detected incident prior to full analysis
+
+    Slots keep per-incident memory well below an equivalent dict and make
+    field access a fixed-offset read on the detection hot path.
+    """
+    type: str
+    description: str
+    severity: str
+    affected_services: List[str]
+    evidence: Dict[str, Any] = field(default_factory=dict)
+    pattern_name: Optional[str] = None
+    incident_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DetectedIncident':
+        """Build a record from an externally supplied incident dict"""
+        return cls(
+            type=data.get('type', 'unknown'),
+            description=data.get('description', ''),
+            severity=data.get('severity', 'medium'),
+            affected_services=data.get('affected_services', []),
+            evidence=data.get('evidence', {}),
+            pattern_name=data.get('pattern_name'),
+            incident_id=data.get('incident_id')
+        )
+
+# Literal message tokens referenced by the symptom checks, compiled into one
+# alternation so each message is scanned once for every token instead of once
+# per symptom. Longer tokens come first so nested literals match consistently.
+_SYMPTOM_TOKENS = (
+    'out of memory', 'response_time', 'cache miss', 'connection', 'timeout',
+    'database', 'consumer', 'message', 'restart', 'payment', 'memory',
+    'failed', 'usage', 'queue', 'depth', 'delay', 'load', 'oom', 'lag',
+)
+_TOKEN_SCAN_RE = re.compile('|'.join(map(re.escape, _SYMPTOM_TOKENS)))
+
+_ERROR_LEVELS = frozenset({'ERROR', 'FATAL'})
+
+# Service tiers for user-impact estimation
+_TIER1_SERVICES = frozenset({'auth-service', 'payment-service'})
+_TIER2_SERVICES = frozenset({'user-service'})
+
+# Fixed-shape payload template for the root-cause response; copied and
+# filled per request instead of rebuilding the dict literal
+_ROOT_CAUSE_TEMPLATE = {'incident_id': None, 'analysis': None, 'found': False}
+
+# One bit per token so a log's matched tokens pack into a single int and the
+# symptom checks reduce to C-level bitwise tests instead of set lookups
+_TOKEN_BITS = {token: 1 << i for i, token in enumerate(_SYMPTOM_TOKENS)}
+
+def _token_mask(*tokens: str) -> int:
+    mask = 0
+    for token in tokens:
+        mask |= _TOKEN_BITS[token]
+    return mask
+
+_B_RESPONSE_TIME = _token_mask('response_time')
+_B_CONNECTION = _token_mask('connection')
+_B_TIMEOUT = _token_mask('timeout')
+_B_MEM_USAGE = _token_mask('memory', 'usage')
+_B_OOM_ANY = _token_mask('out of memory', 'oom')
+_B_RESTART = _token_mask('restart')
+_B_PAYMENT_FAILED = _token_mask('payment', 'failed')
+_B_DB_LOAD = _token_mask('database', 'load')
+_B_CACHE_MISS = _token_mask('cache miss')
+_B_QUEUE_DEPTH = _token_mask('queue', 'depth')
+_B_MSG_DELAY = _token_mask('message', 'delay')
+_B_CONSUMER_LAG = _token_mask('consumer', 'lag')
+
+def _scan_message_tokens(message: str) -> int:
+    """Collect every symptom token present in a message into one bitmask"""
+    bits = 0
+    for token in _TOKEN_SCAN_RE.findall(message.lower()):
+        bits |= _TOKEN_BITS[token]
+    # 'out of memory' swallows the nested 'memory' literal during the scan
+    if bits & _TOKEN_BITS['out of memory']:
+        bits |= _TOKEN_BITS['memory']
+    return bits
+
+# Symptom predicates evaluated against the flattened per-log rows
+# (token bits, level, status_code, response_time_ms); built once at import
+# instead of per _check_symptom_in_logs call
+_SYMPTOM_CHECKS: Dict[str, Callable[[int, str, int, int], bool]] = {
+    'high_response_time': lambda bits, level, status, rt: bool(bits & _B_RESPONSE_TIME) or rt > 2000,
+    'connection_errors': lambda bits, level, status, rt: bool(bits & _B_CONNECTION) and
+                                   level in _ERROR_LEVELS,
+    'timeout_errors': lambda bits, level, status, rt: bool(bits & _B_TIMEOUT) and
+                                level in _ERROR_LEVELS,
+    'increasing_memory_usage': lambda bits, level, status, rt: bits & _B_MEM_USAGE == _B_MEM_USAGE,
+    'oom_errors': lambda bits, level, status, rt: bool(bits & _B_OOM_ANY),
+    'service_restarts': lambda bits, level, status, rt: bool(bits & _B_RESTART),
+    'api_errors': lambda bits, level, status, rt: status >= 400,
+    'failed_payments': lambda bits, level, status, rt: bits & _B_PAYMENT_FAILED == _B_PAYMENT_FAILED,
+    'database_load_increase': lambda bits, level, status, rt: bits & _B_DB_LOAD == _B_DB_LOAD,
+    'cache_misses': lambda bits, level, status, rt: bool(bits & _B_CACHE_MISS),
+    'queue_depth_increase': lambda bits, level, status, rt: bits & _B_QUEUE_DEPTH == _B_QUEUE_DEPTH,
+    'message_delays': lambda bits, level, status, rt: bits & _B_MSG_DELAY == _B_MSG_DELAY,
+    'consumer_lag': lambda bits, level, status, rt: bits & _B_CONSUMER_LAG == _B_CONSUMER_LAG
+}
+
+def _logs_to_soa(logs: List[Dict[str, Any]], start: int = 0) -> List[Tuple[int, str, int, int]]:
+    """Flatten log dicts into (token bits, level, status_code, response_time_ms) rows
+
+    Built once per batch so every pattern's symptom checks read plain tuple
+    fields instead of repeating the nested dict lookups for each log. The
+    start offset selects the recent window without slicing the batch.
+    """
+    rows = []
+    for log in islice(logs, start, None):
+        metadata = log.get('metadata', {})
+        message = log.get('message', '')
+        if not isinstance(message, str):
+            message = str(message)
+        rows.append((
+            _scan_message_tokens(message),
+            log.get('level', ''),
+            metadata.get('status_code', 200),
+            metadata.get('response_time_ms', 0)
+        ))
+    return rows
+
 class AnalyzerAgent(BaseAgent):
     """Agent responsible for analyzing logs and detecting incidents"""
     
@@ -30,7 +158,19 @@ class AnalyzerAgent(BaseAgent):
         self.service_topology = SERVICE_TOPOLOGY
         self.detection_config = INCIDENT_DETECTION
         self.active_incidents = {}
-        self.analysis_history = []
+        # Bounded insertion-ordered map keyed by incident_id: O(1) insert and
+        # lookup, oldest analyses evicted once the cap is reached
+        self.analysis_history: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._history_max = 10_000
+        self._reverse_deps: Dict[str, Set[str]] = {}
+        # Bound concurrent model calls so gathered analyses don't get throttled
+        self._bedrock_semaphore = asyncio.Semaphore(
+            config.AGENT_CONFIG.get('max_concurrent_bedrock', 4)
+        )
+        # When set, non-critical incidents defer their root-cause analysis to
+        # a batched flush instead of one interactive model call each
+        self.batch_mode = False
+        self._pending_batch: List[Tuple['DetectedIncident', List[Dict[str, Any]], Dict[str, Any]]] = []
         
         # Register message handlers
         self.register_handler("logs_processed", self._handle_logs_processed)
@@ -43,6 +183,19 @@ class AnalyzerAgent(BaseAgent):
         print(f"Initializing Analyzer Agent...")
         print(f"Loaded {len(self.incident_patterns)} incident patterns")
         print(f"Monitoring {len(self.service_topology)} services")
+
+        # Reverse dependency index: dependency -> services depending on it,
+        # so downstream lookups are dict fetches instead of topology scans
+        for svc_name, svc_info in self.service_topology.items():
+            for dep in svc_info.get('dependencies', []):
+                self._reverse_deps.setdefault(dep, set()).add(svc_name)
+        # Downstream lookups cached against the old index are now stale
+        self._get_downstream_services.cache_clear()
+
+        # Precompute each pattern's detection threshold (at least half its
+        # symptoms) so the hot path compares against a ready integer
+        for pattern in self.incident_patterns.values():
+            pattern['_min_symptoms'] = max(1, (len(pattern.get('symptoms', [])) + 1) // 2)
     
     async def cleanup(self):
         """Cleanup resources"""
@@ -59,57 +212,70 @@ class AnalyzerAgent(BaseAgent):
         # Detect incidents
         incidents = await self._detect_incidents(logs, summary)
         
-        # Analyze each incident
-        analysis_results = []
-        for incident in incidents:
-            analysis = await self._analyze_incident(incident, logs)
-            analysis_results.append(analysis)
-            
-            # Send incident notification
-            if analysis['severity'] in ['high', 'critical']:
-                await self._notify_incident(analysis)
+        # One timestamp per batch - every incident analyzed in this tick
+        # shares it instead of calling utcnow()/strftime per incident; the
+        # counter suffix keeps generated ids unique within the batch
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        now_id = now.strftime('%Y%m%d_%H%M%S')
+
+        # Analyze incidents concurrently - each analysis awaits model calls,
+        # so gather overlaps their latency instead of summing it
+        analysis_results = list(await asyncio.gather(
+            *(self._analyze_incident(incident, logs, now_iso, f"inc_{now_id}_{i}")
+              for i, incident in enumerate(incidents))
+        ))
+
+        # Fill in any analyses deferred by batch mode before responding
+        if self.batch_mode:
+            await self._flush_analysis_batch()
+
+        # Send incident notifications
+        urgent = [a for a in analysis_results if a['severity'] in ['high', 'critical']]
+        if urgent:
+            await asyncio.gather(*(self._notify_incident(analysis) for analysis in urgent))
         
         return MCPMessage(
             message_type="analysis_completed",
             payload={
                 'incidents_detected': len(incidents),
                 'analysis_results': analysis_results,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': now_iso
             },
             source=self.agent_id,
             target=message.source,
             correlation_id=message.correlation_id
         )
     
-    async def _detect_incidents(self, logs: List[Dict[str, Any]], summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _detect_incidents(self, logs: List[Dict[str, Any]], summary: Dict[str, Any]) -> List[DetectedIncident]:
         """Detect incidents from logs and summary"""
         incidents = []
         
         # Check error rate threshold
         error_rate = summary.get('error_rate', 0)
         if error_rate > self.detection_config['error_rate_threshold']:
-            incidents.append({
-                'type': 'high_error_rate',
-                'description': f'High error rate detected: {error_rate:.2%}',
-                'severity': 'high' if error_rate > 0.3 else 'medium',
-                'affected_services': list(summary.get('service_distribution', {}).keys()),
-                'evidence': {
+            incidents.append(DetectedIncident(
+                type='high_error_rate',
+                description=f'High error rate detected: {error_rate:.2%}',
+                severity='high' if error_rate > 0.3 else 'medium',
+                affected_services=list(summary.get('service_distribution', {}).keys()),
+                evidence={
                     'error_rate': error_rate,
                     'recent_errors': summary.get('recent_errors', [])
                 }
-            })
+            ))
         
         # Check for anomalies
         anomalies = summary.get('anomalies_detected', [])
         for anomaly in anomalies:
             if anomaly.get('severity') in ['high', 'critical']:
-                incidents.append({
-                    'type': anomaly['type'],
-                    'description': anomaly['description'],
-                    'severity': anomaly['severity'],
-                    'affected_services': [anomaly.get('affected_service')] if anomaly.get('affected_service') else [],
-                    'evidence': {'anomaly_data': anomaly}
-                })
+                incidents.append(DetectedIncident(
+                    type=anomaly['type'],
+                    description=anomaly['description'],
+                    severity=anomaly['severity'],
+                    affected_services=[anomaly.get('affected_service')] if anomaly.get('affected_service') else [],
+                    evidence={'anomaly_data': anomaly}
+                ))
         
         # Pattern-based detection
         pattern_incidents = await self._detect_pattern_incidents(logs)
@@ -117,90 +283,91 @@ class AnalyzerAgent(BaseAgent):
         
         return incidents
     
-    async def _detect_pattern_incidents(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _detect_pattern_incidents(self, logs: List[Dict[str, Any]]) -> List[DetectedIncident]:
         """Detect incidents based on known patterns"""
         incidents = []
-        
+
+        # Flatten the recent window once per batch; every pattern's symptom
+        # checks share the same structure-of-arrays rows. The offset avoids
+        # copying the batch just to take the last 20 entries.
+        scanned = _logs_to_soa(logs, max(0, len(logs) - 20))
+
+        # Patterns share symptoms (e.g. connection_errors, timeout_errors);
+        # memoize each symptom's verdict so its scan runs once per batch no
+        # matter how many patterns reference it
+        symptom_cache: Dict[str, bool] = {}
+
         for pattern_name, pattern in self.incident_patterns.items():
             # Check if pattern symptoms are present
-            symptoms_detected = self._check_pattern_symptoms(logs, pattern)
+            symptoms_detected = self._check_pattern_symptoms(scanned, pattern, symptom_cache)
             if symptoms_detected:
-                incidents.append({
-                    'type': 'pattern_match',
-                    'pattern_name': pattern_name,
-                    'description': pattern['description'],
-                    'severity': 'high',
-                    'affected_services': pattern['affected_services'],
-                    'evidence': {
+                incidents.append(DetectedIncident(
+                    type='pattern_match',
+                    pattern_name=pattern_name,
+                    description=pattern['description'],
+                    severity='high',
+                    affected_services=pattern['affected_services'],
+                    evidence={
                         'pattern_match': pattern_name,
                         'symptoms_detected': symptoms_detected
                     }
-                })
+                ))
         
         return incidents
     
-    def _check_pattern_symptoms(self, logs: List[Dict[str, Any]], pattern: Dict[str, Any]) -> List[str]:
-        """Check if pattern symptoms are present in logs"""
+    def _check_pattern_symptoms(self, scanned: List[Tuple[int, str, int, int]], pattern: Dict[str, Any],
+                                symptom_cache: Dict[str, bool]) -> List[str]:
+        """Check if pattern symptoms are present in the flattened log rows"""
         detected_symptoms = []
         symptoms = pattern.get('symptoms', [])
-        
+        min_symptoms = pattern.get('_min_symptoms') or max(1, (len(symptoms) + 1) // 2)
+
         for symptom in symptoms:
-            if self._check_symptom_in_logs(logs, symptom):
+            detected = symptom_cache.get(symptom)
+            if detected is None:
+                detected = symptom_cache[symptom] = self._check_symptom_in_logs(scanned, symptom)
+            if detected:
                 detected_symptoms.append(symptom)
-        
-        # Return symptoms if at least 50% are detected
-        if len(detected_symptoms) >= len(symptoms) * 0.5:
-            return detected_symptoms
-        
+                # At least 50% detected - skip the remaining symptom scans
+                if len(detected_symptoms) >= min_symptoms:
+                    return detected_symptoms
+
         return []
     
-    def _check_symptom_in_logs(self, logs: List[Dict[str, Any]], symptom: str) -> bool:
-        """Check if a specific symptom is present in logs"""
-        symptom_patterns = {
-            'high_response_time': lambda log: 'response_time' in str(log.get('message', '')).lower() or 
-                                           log.get('metadata', {}).get('response_time_ms', 0) > 2000,
-            'connection_errors': lambda log: 'connection' in str(log.get('message', '')).lower() and 
-                                           log.get('level') in ['ERROR', 'FATAL'],
-            'timeout_errors': lambda log: 'timeout' in str(log.get('message', '')).lower() and 
-                                        log.get('level') in ['ERROR', 'FATAL'],
-            'increasing_memory_usage': lambda log: 'memory' in str(log.get('message', '')).lower() and 
-                                                  'usage' in str(log.get('message', '')).lower(),
-            'oom_errors': lambda log: 'out of memory' in str(log.get('message', '')).lower() or 
-                                    'oom' in str(log.get('message', '')).lower(),
-            'service_restarts': lambda log: 'restart' in str(log.get('message', '')).lower(),
-            'api_errors': lambda log: log.get('metadata', {}).get('status_code', 200) >= 400,
-            'failed_payments': lambda log: 'payment' in str(log.get('message', '')).lower() and 
-                                         'failed' in str(log.get('message', '')).lower(),
-            'database_load_increase': lambda log: 'database' in str(log.get('message', '')).lower() and 
-                                                'load' in str(log.get('message', '')).lower(),
-            'cache_misses': lambda log: 'cache miss' in str(log.get('message', '')).lower(),
-            'queue_depth_increase': lambda log: 'queue' in str(log.get('message', '')).lower() and 
-                                              'depth' in str(log.get('message', '')).lower(),
-            'message_delays': lambda log: 'message' in str(log.get('message', '')).lower() and 
-                                        'delay' in str(log.get('message', '')).lower(),
-            'consumer_lag': lambda log: 'consumer' in str(log.get('message', '')).lower() and 
-                                      'lag' in str(log.get('message', '')).lower()
-        }
-        
-        pattern_check = symptom_patterns.get(symptom)
+    def _check_symptom_in_logs(self, scanned: List[Tuple[int, str, int, int]], symptom: str) -> bool:
+        """Check if a specific symptom is present in the scanned log rows"""
+        pattern_check = _SYMPTOM_CHECKS.get(symptom)
         if not pattern_check:
             return False
-        
-        # Check last 20 logs for symptom
-        recent_logs = logs[-20:] if len(logs) > 20 else logs
-        symptom_count = sum(1 for log in recent_logs if pattern_check(log))
-        
-        return symptom_count >= 2  # At least 2 occurrences
+
+        # Stop scanning as soon as the second occurrence confirms the symptom
+        count = 0
+        for row in scanned:
+            if pattern_check(*row):
+                count += 1
+                if count >= 2:  # At least 2 occurrences
+                    return True
+
+        return False
     
-    async def _analyze_incident(self, incident: Dict[str, Any], logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_incident(self, incident: DetectedIncident, logs: List[Dict[str, Any]],
+                                now_iso: Optional[str] = None,
+                                default_id: Optional[str] = None) -> Dict[str, Any]:
         """Perform detailed analysis of an incident"""
+        # Batch callers share one timestamp and a pre-built default id;
+        # standalone calls fall back to computing them here
+        if now_iso is None:
+            now_iso = datetime.utcnow().isoformat()
+        if default_id is None:
+            default_id = f"inc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+
         analysis = {
-            'incident_id': incident.get('incident_id', f"inc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"),
-            'type': incident['type'],
-            'description': incident['description'],
-            'severity': incident['severity'],
-            'affected_services': incident['affected_services'],
-            'timestamp': datetime.utcnow().isoformat(),
+            'incident_id': incident.incident_id or default_id,
+            'type': incident.type,
+            'description': incident.description,
+            'severity': incident.severity,
+            'affected_services': incident.affected_services,
+            'timestamp': now_iso,
             'root_cause_hypothesis': None,
             'confidence_score': 0.0,
             'evidence': [],
@@ -208,11 +375,19 @@ class AnalyzerAgent(BaseAgent):
             'impact_assessment': {}
         }
         
-        # Generate root cause hypothesis
-        root_cause = await self._generate_root_cause_hypothesis(incident, logs)
-        analysis['root_cause_hypothesis'] = root_cause['hypothesis']
-        analysis['confidence_score'] = root_cause['confidence']
-        analysis['evidence'] = root_cause['evidence']
+        # Generate root cause hypothesis; the semaphore caps how many of the
+        # gathered analyses hit the model at once. In batch mode non-critical
+        # incidents park their analysis for the next _flush_analysis_batch
+        # pass - critical incidents always take the immediate path.
+        root_cause = None
+        if self.batch_mode and incident.severity != 'critical':
+            self._pending_batch.append((incident, logs, analysis))
+        else:
+            async with self._bedrock_semaphore:
+                root_cause = await self._generate_root_cause_hypothesis(incident, logs)
+            analysis['root_cause_hypothesis'] = root_cause['hypothesis']
+            analysis['confidence_score'] = root_cause['confidence']
+            analysis['evidence'] = root_cause['evidence']
         
         # Generate remediation steps
         remediation = await self._generate_remediation_steps(incident, root_cause)
@@ -222,19 +397,42 @@ class AnalyzerAgent(BaseAgent):
         impact = self._assess_incident_impact(incident)
         analysis['impact_assessment'] = impact
         
-        # Store analysis
-        self.analysis_history.append(analysis)
-        
+        # Store analysis, evicting the oldest entry once at capacity
+        self.analysis_history[analysis['incident_id']] = analysis
+        if len(self.analysis_history) > self._history_max:
+            self.analysis_history.popitem(last=False)
+
         return analysis
-    
-    async def _generate_root_cause_hypothesis(self, incident: Dict[str, Any], logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+    async def _flush_analysis_batch(self):
+        """Run the root-cause analyses deferred while in batch mode
+
+        Pending non-critical incidents are analyzed together in one pass -
+        the batched, throughput-oriented counterpart to the interactive
+        per-incident path taken by critical incidents.
+        """
+        if not self._pending_batch:
+            return
+
+        batch, self._pending_batch = self._pending_batch, []
+        hypotheses = await asyncio.gather(
+            *(self._generate_root_cause_hypothesis(incident, logs)
+              for incident, logs, _ in batch)
+        )
+
+        for (_, _, analysis), root_cause in zip(batch, hypotheses):
+            analysis['root_cause_hypothesis'] = root_cause['hypothesis']
+            analysis['confidence_score'] = root_cause['confidence']
+            analysis['evidence'] = root_cause['evidence']
+
+    async def _generate_root_cause_hypothesis(self, incident: DetectedIncident, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate root cause hypothesis"""
-        incident_type = incident['type']
-        affected_services = incident['affected_services']
-        
+        incident_type = incident.type
+        affected_services = incident.affected_services
+
         # Pattern-based root cause analysis
         if incident_type == 'pattern_match':
-            pattern_name = incident.get('pattern_name')
+            pattern_name = incident.pattern_name
             if pattern_name in self.incident_patterns:
                 pattern = self.incident_patterns[pattern_name]
                 return {
@@ -256,21 +454,18 @@ class AnalyzerAgent(BaseAgent):
         
         # Error rate analysis
         elif incident_type == 'high_error_rate':
-            error_evidence = incident.get('evidence', {})
+            error_evidence = incident.evidence
             recent_errors = error_evidence.get('recent_errors', [])
             
-            # Analyze error patterns
-            error_services = {}
-            error_types = {}
-            for error in recent_errors:
-                service = error.get('service', 'unknown')
-                message = error.get('message', '')
-                error_services[service] = error_services.get(service, 0) + 1
-                error_types[message] = error_types.get(message, 0) + 1
-            
+            # Analyze error patterns in a single counting pass. Messages are
+            # truncated to bound hash cost and interned so the repeats that
+            # dominate real log streams share one key object with a cached hash
+            error_services = Counter(error.get('service', 'unknown') for error in recent_errors)
+            error_types = Counter(sys.intern(error.get('message', '')[:200]) for error in recent_errors)
+
             # Find most frequent error
-            most_frequent_error = max(error_types.items(), key=lambda x: x[1]) if error_types else None
-            most_affected_service = max(error_services.items(), key=lambda x: x[1]) if error_services else None
+            most_frequent_error = error_types.most_common(1)[0] if error_types else None
+            most_affected_service = error_services.most_common(1)[0] if error_services else None
             
             hypothesis = f"High error rate likely caused by issues in {most_affected_service[0] if most_affected_service else 'multiple services'}"
             if most_frequent_error:
@@ -284,8 +479,8 @@ class AnalyzerAgent(BaseAgent):
                         'type': 'error_analysis',
                         'description': 'Error pattern analysis',
                         'data': {
-                            'error_services': error_services,
-                            'error_types': dict(list(error_types.items())[:5])  # Top 5 errors
+                            'error_services': dict(error_services),
+                            'error_types': dict(error_types.most_common(5))  # Top 5 errors
                         }
                     }
                 ],
@@ -331,7 +526,7 @@ class AnalyzerAgent(BaseAgent):
                 {
                     'type': 'basic_analysis',
                     'description': 'Limited automated analysis available',
-                    'data': incident
+                    'data': asdict(incident)
                 }
             ],
             'reasoning_chain': [
@@ -341,13 +536,13 @@ class AnalyzerAgent(BaseAgent):
             ]
         }
     
-    async def _generate_remediation_steps(self, incident: Dict[str, Any], root_cause: Dict[str, Any]) -> List[str]:
+    async def _generate_remediation_steps(self, incident: DetectedIncident, root_cause: Dict[str, Any]) -> List[str]:
         """Generate remediation steps"""
-        incident_type = incident['type']
-        
+        incident_type = incident.type
+
         # Pattern-based remediation
         if incident_type == 'pattern_match':
-            pattern_name = incident.get('pattern_name')
+            pattern_name = incident.pattern_name
             if pattern_name in self.incident_patterns:
                 return self.incident_patterns[pattern_name]['remediation']
         
@@ -365,15 +560,15 @@ class AnalyzerAgent(BaseAgent):
         
         return generic_steps
     
-    def _assess_incident_impact(self, incident: Dict[str, Any]) -> Dict[str, Any]:
+    def _assess_incident_impact(self, incident: DetectedIncident) -> Dict[str, Any]:
         """Assess the impact of an incident"""
-        affected_services = incident['affected_services']
-        severity = incident['severity']
+        affected_services = incident.affected_services
+        severity = incident.severity
         
-        # Calculate criticality based on service topology
+        # Calculate criticality in a single pass over the affected services
         total_criticality = 0
         high_criticality_services = 0
-        
+
         for service in affected_services:
             service_info = self.service_topology.get(service, {})
             criticality = service_info.get('criticality', 'low')
@@ -384,7 +579,7 @@ class AnalyzerAgent(BaseAgent):
                 total_criticality += 2
             else:
                 total_criticality += 1
-        
+
         # Estimate affected users (simplified)
         user_impact = "low"
         if high_criticality_services > 0:
@@ -398,25 +593,30 @@ class AnalyzerAgent(BaseAgent):
             'affected_service_count': len(affected_services),
             'high_criticality_services': high_criticality_services,
             'estimated_affected_users': self._estimate_affected_users(affected_services),
-            'downstream_services': self._get_downstream_services(affected_services)
+            'downstream_services': self._get_downstream_services(
+                tuple(sorted(affected_services)))
         }
     
     def _estimate_affected_users(self, services: List[str]) -> str:
         """Estimate number of affected users"""
-        if any(service in ['auth-service', 'payment-service'] for service in services):
+        svc_set = set(services)
+        if svc_set & _TIER1_SERVICES:
             return "10,000+"
-        elif any(service in ['user-service'] for service in services):
+        elif svc_set & _TIER2_SERVICES:
             return "5,000+"
         else:
             return "< 1,000"
     
-    def _get_downstream_services(self, services: List[str]) -> List[str]:
-        """Get services that depend on the affected services"""
+    @functools.lru_cache(maxsize=1024)
+    def _get_downstream_services(self, services: Tuple[str, ...]) -> List[str]:
+        """Get services that depend on the affected services
+
+        Memoized per service tuple - callers pass tuple(sorted(services)) so
+        repeated affected-service sets resolve from the cache.
+        """
         downstream = set()
         for service in services:
-            for svc_name, svc_info in self.service_topology.items():
-                if service in svc_info.get('dependencies', []):
-                    downstream.add(svc_name)
+            downstream.update(self._reverse_deps.get(service, ()))
         return list(downstream)
     
     async def _notify_incident(self, analysis: Dict[str, Any]):
@@ -438,8 +638,8 @@ class AnalyzerAgent(BaseAgent):
         payload = message.payload
         incident_data = payload.get('incident')
         logs = payload.get('logs', [])
-        
-        analysis = await self._analyze_incident(incident_data, logs)
+
+        analysis = await self._analyze_incident(DetectedIncident.from_dict(incident_data or {}), logs)
         
         return MCPMessage(
             message_type="incident_analysis_response",
@@ -454,20 +654,17 @@ class AnalyzerAgent(BaseAgent):
         payload = message.payload
         incident_id = payload.get('incident_id')
         
-        # Find analysis in history
-        analysis = None
-        for hist in self.analysis_history:
-            if hist.get('incident_id') == incident_id:
-                analysis = hist
-                break
-        
+        # History is keyed by incident_id, so this is a direct lookup
+        analysis = self.analysis_history.get(incident_id)
+
+        response = _ROOT_CAUSE_TEMPLATE.copy()
+        response['incident_id'] = incident_id
+        response['analysis'] = analysis
+        response['found'] = analysis is not None
+
         return MCPMessage(
             message_type="root_cause_response",
-            payload={
-                'incident_id': incident_id,
-                'analysis': analysis,
-                'found': analysis is not None
-            },
+            payload=response,
             source=self.agent_id,
             target=message.source,
             correlation_id=message.correlation_id
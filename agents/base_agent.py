@@ -2,18 +2,34 @@
 Base MCP Agent class for NEXUS MVP
 """
 import asyncio
+import inspect
 import json
-import uuid
+import logging
+import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Callable
 from abc import ABC, abstractmethod
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 class MCPMessage:
     """MCP Protocol message"""
-    def __init__(self, message_type: str, payload: Dict[str, Any], 
+    __slots__ = ('id', 'timestamp', '_timestamp_iso', 'message_type',
+                 'payload', 'source', 'target', 'correlation_id')
+
+    def __init__(self, message_type: str, payload: Dict[str, Any],
                  source: str, target: str = None, correlation_id: str = None):
-        self.id = str(uuid.uuid4())
+        # Correlation ids only need uniqueness, not UUID semantics -
+        # urandom().hex() skips the UUID object construction entirely
+        self.id = os.urandom(16).hex()
         self.timestamp = datetime.utcnow()
+        # Formatted once; to_dict is called repeatedly on the same message
+        self._timestamp_iso = self.timestamp.isoformat()
         self.message_type = message_type
         self.payload = payload
         self.source = source
@@ -23,7 +39,7 @@ class MCPMessage:
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self._timestamp_iso,
             "type": self.message_type,
             "payload": self.payload,
             "source": self.source,
@@ -31,6 +47,16 @@ class MCPMessage:
             "correlation_id": self.correlation_id
         }
     
+    def to_wire(self) -> bytes:
+        """Serialize the message for transports and sinks that need JSON
+
+        Uses orjson when installed - considerably faster on the deeply
+        nested analysis payloads - and falls back to the stdlib encoder.
+        """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), default=str).encode()
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MCPMessage':
         msg = cls(
@@ -42,31 +68,48 @@ class MCPMessage:
         )
         msg.id = data["id"]
         msg.timestamp = datetime.fromisoformat(data["timestamp"])
+        msg._timestamp_iso = data["timestamp"]
         return msg
 
 class BaseAgent(ABC):
     """Base class for MCP agents"""
     
-    def __init__(self, agent_id: str, agent_type: str, capabilities: List[str]):
+    def __init__(self, agent_id: str, agent_type: str, capabilities: List[str],
+                 queue_maxsize: int = 4096):
         self.agent_id = agent_id
         self.agent_type = agent_type
         self.capabilities = capabilities
         self.status = "starting"
         self.last_heartbeat = datetime.utcnow()
-        self.message_handlers: Dict[str, Callable] = {}
-        self.message_queue = asyncio.Queue()
+        self._last_heartbeat_iso = self.last_heartbeat.isoformat()
+        # Per-instance handlers registered by subclasses; the shared
+        # defaults live in the class-level _DEFAULT_HANDLERS table
+        self._overrides: Dict[str, Callable] = {}
+        # Bounded so a producer storm cannot grow memory without limit
+        self.message_queue = asyncio.Queue(maxsize=queue_maxsize)
+        # Set whenever work arrives so run loops can wait on it instead
+        # of polling with a fixed sleep
+        self._wake = asyncio.Event()
         self.running = False
         self.tasks_processed = 0
         self.errors = 0
-        
-        # Register default handlers
-        self.register_handler("ping", self._handle_ping)
-        self.register_handler("heartbeat_request", self._handle_heartbeat_request)
-        self.register_handler("status_request", self._handle_status_request)
-    
+
+        # Outgoing messages accumulate here between micro-batch flushes
+        self._send_buffer: List[MCPMessage] = []
+        self._send_interval = 0.05  # seconds between flushes
+
+        # Built once; _heartbeat_loop mutates the changing fields in place
+        self._heartbeat_payload = {
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "timestamp": None,
+            "tasks_processed": 0,
+            "errors": 0
+        }
+
     def register_handler(self, message_type: str, handler: Callable):
         """Register a message handler"""
-        self.message_handlers[message_type] = handler
+        self._overrides[message_type] = handler
     
     async def start(self):
         """Start the agent"""
@@ -78,6 +121,9 @@ class BaseAgent(ABC):
         
         # Start heartbeat
         asyncio.create_task(self._heartbeat_loop())
+
+        # Start the micro-batch sender
+        asyncio.create_task(self._send_loop())
         
         # Agent-specific initialization
         await self.initialize()
@@ -89,7 +135,11 @@ class BaseAgent(ABC):
         """Stop the agent"""
         self.status = "stopping"
         self.running = False
-        
+
+        # Wake the message loop so it can observe shutdown
+        await self.message_queue.put(None)
+        self._wake.set()
+
         # Agent-specific cleanup
         await self.cleanup()
         
@@ -97,45 +147,84 @@ class BaseAgent(ABC):
         print(f"Agent {self.agent_id} stopped")
     
     async def send_message(self, message: MCPMessage):
-        """Send a message (to be implemented by message bus)"""
-        # In MVP, we'll just print the message
-        print(f"[{self.agent_id}] Sending: {message.message_type} -> {message.target}")
-        print(f"  Payload: {json.dumps(message.payload, indent=2)}")
+        """Queue a message for the next micro-batch flush"""
+        self._send_buffer.append(message)
+
+    async def _send_loop(self):
+        """Flush buffered outgoing messages every _send_interval
+
+        Batching amortizes serialization and scheduling across the
+        heartbeats, responses and errors produced between two flushes.
+        """
+        while self.running:
+            await asyncio.sleep(self._send_interval)
+            self._flush_send_buffer()
+        # Final flush so nothing queued during shutdown is lost
+        self._flush_send_buffer()
+
+    def _flush_send_buffer(self):
+        """Serialize and emit everything queued since the last flush"""
+        if not self._send_buffer:
+            return
+        batch, self._send_buffer = self._send_buffer, []
+        # In MVP there is no transport; serialize and report only when
+        # someone is listening - %s formatting is deferred by logging
+        if logger.isEnabledFor(logging.DEBUG):
+            if orjson is not None:
+                wire = orjson.dumps([m.to_dict() for m in batch])
+            else:
+                wire = json.dumps([m.to_dict() for m in batch], default=str).encode()
+            logger.debug("[%s] Sent batch of %s messages (%s bytes)",
+                         self.agent_id, len(batch), len(wire))
     
     async def receive_message(self, message: MCPMessage):
         """Receive a message from the message bus"""
-        await self.message_queue.put(message)
+        try:
+            self.message_queue.put_nowait(message)
+            self._wake.set()
+        except asyncio.QueueFull:
+            # Drop rather than block the bus; the counter surfaces overload
+            self.errors += 1
+            logger.warning("[%s] Message queue full, dropping: %s",
+                           self.agent_id, message.message_type)
     
     async def _message_loop(self):
         """Main message processing loop"""
         while self.running:
             try:
-                # Wait for message with timeout
-                message = await asyncio.wait_for(
-                    self.message_queue.get(), 
-                    timeout=1.0
-                )
-                
+                # Block until a message arrives - no timeout polling, so an
+                # idle agent costs nothing; stop() enqueues a None sentinel
+                message = await self.message_queue.get()
+                if message is None:
+                    break
+
                 await self._process_message(message)
                 self.tasks_processed += 1
-                
-            except asyncio.TimeoutError:
-                # No message received, continue
-                continue
+
             except Exception as e:
                 self.errors += 1
-                print(f"Error processing message in {self.agent_id}: {e}")
+                logger.error("Error processing message in %s: %s", self.agent_id, e)
     
     async def _process_message(self, message: MCPMessage):
         """Process a received message"""
-        handler = self.message_handlers.get(message.message_type)
+        handler = self._overrides.get(message.message_type)
+        if handler is not None:
+            bound = True
+        else:
+            handler = self._DEFAULT_HANDLERS.get(message.message_type)
+            bound = False
         if handler:
             try:
-                response = await handler(message)
+                # Handlers may be plain functions - awaiting only actual
+                # coroutines skips the coroutine allocation for the simple
+                # control-plane messages that dominate traffic
+                response = handler(message) if bound else handler(self, message)
+                if inspect.iscoroutine(response):
+                    response = await response
                 if response:
                     await self.send_message(response)
             except Exception as e:
-                print(f"Error in handler {message.message_type}: {e}")
+                logger.error("Error in handler %s: %s", message.message_type, e)
                 # Send error response
                 error_response = MCPMessage(
                     message_type="error",
@@ -149,27 +238,28 @@ class BaseAgent(ABC):
                 )
                 await self.send_message(error_response)
         else:
-            print(f"No handler for message type: {message.message_type}")
+            logger.debug("No handler for message type: %s", message.message_type)
     
     async def _heartbeat_loop(self):
         """Send periodic heartbeats"""
         while self.running:
             try:
                 self.last_heartbeat = datetime.utcnow()
-                
+                self._last_heartbeat_iso = self.last_heartbeat.isoformat()
+
+                payload = self._heartbeat_payload
+                payload["status"] = self.status
+                payload["timestamp"] = self._last_heartbeat_iso
+                payload["tasks_processed"] = self.tasks_processed
+                payload["errors"] = self.errors
+
                 heartbeat = MCPMessage(
                     message_type="heartbeat",
-                    payload={
-                        "agent_id": self.agent_id,
-                        "status": self.status,
-                        "timestamp": self.last_heartbeat.isoformat(),
-                        "tasks_processed": self.tasks_processed,
-                        "errors": self.errors
-                    },
+                    payload=payload,
                     source=self.agent_id,
                     target="registry"
                 )
-                
+
                 await self.send_message(heartbeat)
                 await asyncio.sleep(30)  # Heartbeat every 30 seconds
                 
@@ -177,7 +267,7 @@ class BaseAgent(ABC):
                 print(f"Heartbeat error in {self.agent_id}: {e}")
                 await asyncio.sleep(30)
     
-    async def _handle_ping(self, message: MCPMessage) -> MCPMessage:
+    def _handle_ping(self, message: MCPMessage) -> MCPMessage:
         """Handle ping message"""
         return MCPMessage(
             message_type="pong",
@@ -194,7 +284,7 @@ class BaseAgent(ABC):
             payload={
                 "agent_id": self.agent_id,
                 "status": self.status,
-                "last_heartbeat": self.last_heartbeat.isoformat(),
+                "last_heartbeat": self._last_heartbeat_iso,
                 "capabilities": self.capabilities,
                 "tasks_processed": self.tasks_processed,
                 "errors": self.errors
@@ -224,7 +314,16 @@ class BaseAgent(ABC):
             target=message.source,
             correlation_id=message.correlation_id
         )
-    
+
+    # Shared by every agent instance; built once at class creation. The
+    # entries are plain functions, so _process_message calls them with
+    # an explicit self instead of binding a method per agent
+    _DEFAULT_HANDLERS = {
+        "ping": _handle_ping,
+        "heartbeat_request": _handle_heartbeat_request,
+        "status_request": _handle_status_request,
+    }
+
     @abstractmethod
     async def initialize(self):
         """Agent-specific initialization"""
@@ -241,7 +340,7 @@ class BaseAgent(ABC):
             "agent_id": self.agent_id,
             "agent_type": self.agent_type,
             "status": self.status,
-            "last_heartbeat": self.last_heartbeat.isoformat(),
+            "last_heartbeat": self._last_heartbeat_iso,
             "capabilities": self.capabilities,
             "tasks_processed": self.tasks_processed,
             "errors": self.errors,
@@ -4,19 +4,472 @@ Generates automated remediation plans, runbooks, and recovery scripts
 """
 
 import asyncio
+import functools
 import json
 import logging
+import re
+import string
+import sys
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
-from dataclasses import asdict
 
 from .base_agent import BaseAgent
 from models import Incident, AgentMessage, MessageType
 from bedrock_client import get_bedrock_client
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj) -> str:
+    """Serialize a plan dict, orjson when installed, stdlib otherwise"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+# Plan-generation micro-batching: collect up to _PLAN_BATCH_MAX pending
+# incidents, waiting at most _PLAN_BATCH_WAIT seconds after the first
+_PLAN_BATCH_MAX = 16
+_PLAN_BATCH_WAIT = 0.025
+
+# Shared defaults for generated steps - every step of every plan
+# references these single interned objects instead of allocating a
+# fresh copy of the same literal
+_DEFAULT_TIME = sys.intern("5-10 minutes")
+_DEFAULT_VERIFY = sys.intern("Manual verification required")
+_DEFAULT_ROLLBACK = sys.intern("Document changes for potential rollback")
+
+# Per-step-kind dispatch tables indexed by the _step_kind tag:
+# 0=diagnosis, 1=restart, 2=scale, 3=cleanup, 4=other
+_SCRIPT_KEY_BY_KIND = ('diagnosis', 'mitigation', 'scaling', 'cleanup', None)
+_VERIFY_BY_KIND = (
+    "echo 'Manual verification required'",
+    "systemctl is-active {service_name}",
+    "kubectl get pods | grep {deployment}",
+    "df -h",
+    "echo 'Manual verification required'",
+)
+_ROLLBACK_BY_KIND = (
+    _DEFAULT_ROLLBACK,
+    "Restart can be reversed by stopping service",
+    "Scale back to original replica count",
+    "Restore from backup if files were critical",
+    _DEFAULT_ROLLBACK,
+)
+
+
+def _step_kind(step: str) -> int:
+    """Tag a step description for the dispatch tables
+
+    Runs the lowercasing and substring checks once per step; the
+    commands/verification/rollback helpers then index by the tag instead
+    of repeating the same scans on the raw string.
+    """
+    step_lower = step.lower()
+    if 'identify' in step_lower or 'check' in step_lower:
+        return 0
+    if 'restart' in step_lower:
+        return 1
+    if 'scale' in step_lower:
+        return 2
+    if 'clean' in step_lower:
+        return 3
+    return 4
+
+# Classification keywords in priority order - the first group whose
+# keyword appears in the description wins, matching the old elif chain
+_INCIDENT_KEYWORDS = (
+    ('high_cpu', ('cpu', 'processor', 'load')),
+    ('memory_exhaustion', ('memory', 'ram', 'oom')),
+    ('disk_space', ('disk', 'storage', 'space')),
+    ('service_down', ('service', 'down', 'unavailable')),
+    ('network_latency', ('network', 'latency', 'timeout')),
+    ('database_connection', ('database', 'connection', 'sql')),
+)
+
+# One compiled alternation finds every keyword in a single C-level pass
+# instead of up to 18 separate substring scans per incident
+_KEYWORD_RANKS = {
+    keyword: (rank, incident_type)
+    for rank, (incident_type, keywords) in enumerate(_INCIDENT_KEYWORDS)
+    for keyword in keywords
+}
+_CLASSIFY_RE = re.compile('|'.join(
+    re.escape(keyword)
+    for _, keywords in _INCIDENT_KEYWORDS
+    for keyword in keywords
+))
+
+# Service names recognised in free-text descriptions; the word-bounded
+# alternation finds one in a single scan without tokenizing
+_KNOWN_SERVICES = ('nginx', 'apache', 'mysql', 'postgresql', 'redis', 'docker')
+_SERVICE_RE = re.compile(r'\b(' + '|'.join(_KNOWN_SERVICES) + r')\b')
+
+
+def _classify_description(description: str) -> str:
+    """Classify one lowercased description with a single keyword scan
+
+    Picks the highest-priority matching group, mirroring the original
+    elif chain's ordering.
+    """
+    best = None
+    for match in _CLASSIFY_RE.finditer(description):
+        candidate = _KEYWORD_RANKS[match.group()]
+        if best is None or candidate < best:
+            best = candidate
+            if best[0] == 0:
+                break
+    return best[1] if best else 'general'
+
+
+def classify_bulk(descriptions: List[str]) -> List[str]:
+    """Classify many incident descriptions, e.g. for historical replay
+
+    Keeps the work inside the compiled regex engine with the function
+    lookups hoisted out of the loop, so replaying thousands of archived
+    incidents after a template change skips per-incident model and
+    agent overhead entirely.
+    """
+    classify = _classify_description
+    return [classify(description.lower()) for description in descriptions]
+
+
+# Immutable template data shared by every agent instance; built once
+# at import and wrapped so accidental mutation raises
+_REMEDIATION_TEMPLATES = MappingProxyType({
+    "high_cpu": {
+        "priority": "high",
+        "steps": [
+            "Identify processes consuming high CPU",
+            "Check for runaway processes or memory leaks",
+            "Scale horizontally if needed",
+            "Restart affected services if safe",
+            "Monitor recovery progress"
+        ],
+        "scripts": {
+            "diagnosis": "top -n 1 | head -20; ps aux --sort=-%cpu | head -10",
+            "mitigation": "systemctl restart {service_name}",
+            "scaling": "kubectl scale deployment {deployment} --replicas={replicas}"
+        }
+    },
+    "memory_exhaustion": {
+        "priority": "critical",
+        "steps": [
+            "Identify memory-consuming processes",
+            "Check for memory leaks",
+            "Free up memory by restarting services",
+            "Scale up memory allocation",
+            "Implement memory monitoring"
+        ],
+        "scripts": {
+            "diagnosis": "free -h; ps aux --sort=-%mem | head -10",
+            "mitigation": "systemctl restart {service_name}",
+            "cleanup": "echo 3 > /proc/sys/vm/drop_caches"
+        }
+    },
+    "disk_space": {
+        "priority": "high",
+        "steps": [
+            "Identify large files and directories",
+            "Clean up temporary files",
+            "Archive old logs",
+            "Expand disk space if needed",
+            "Set up log rotation"
+        ],
+        "scripts": {
+            "diagnosis": "df -h; du -sh /* | sort -hr | head -10",
+            "cleanup": "find /tmp -type f -atime +7 -delete",
+            "log_cleanup": "journalctl --vacuum-time=7d"
+        }
+    },
+    "service_down": {
+        "priority": "critical",
+        "steps": [
+            "Check service status",
+            "Review recent logs for errors",
+            "Attempt service restart",
+            "Verify dependencies are running",
+            "Escalate if restart fails"
+        ],
+        "scripts": {
+            "diagnosis": "systemctl status {service_name}; journalctl -u {service_name} --since '10 minutes ago'",
+            "mitigation": "systemctl restart {service_name}",
+            "verification": "systemctl is-active {service_name}"
+        }
+    },
+    "network_latency": {
+        "priority": "medium",
+        "steps": [
+            "Check network connectivity",
+            "Test latency to key endpoints",
+            "Review network configuration",
+            "Check for network congestion",
+            "Contact network team if needed"
+        ],
+        "scripts": {
+            "diagnosis": "ping -c 5 {endpoint}; traceroute {endpoint}",
+            "bandwidth_test": "iperf3 -c {server} -t 10",
+            "dns_check": "nslookup {domain}"
+        }
+    },
+    "database_connection": {
+        "priority": "critical",
+        "steps": [
+            "Check database service status",
+            "Verify connection pool settings",
+            "Test database connectivity",
+            "Review database logs",
+            "Restart connection pools if needed"
+        ],
+        "scripts": {
+            "diagnosis": "systemctl status postgresql; netstat -an | grep 5432",
+            "connection_test": "psql -h {host} -U {user} -c 'SELECT 1;'",
+            "pool_restart": "systemctl restart pgbouncer"
+        }
+    }
+})
+
+_RUNBOOK_LIBRARY = MappingProxyType({
+    "incident_response_checklist": [
+        "Acknowledge incident and start timer",
+        "Assemble incident response team",
+        "Establish communication channels",
+        "Begin initial assessment",
+        "Implement immediate mitigation",
+        "Document all actions taken",
+        "Communicate status to stakeholders",
+        "Conduct post-incident review"
+    ],
+    "service_restart_procedure": [
+        "Check service dependencies",
+        "Drain traffic if load balanced",
+        "Stop service gracefully",
+        "Wait for complete shutdown",
+        "Start service",
+        "Verify service health",
+        "Restore traffic routing",
+        "Monitor for stability"
+    ],
+    "database_recovery": [
+        "Assess database state",
+        "Check for corruption",
+        "Stop application connections",
+        "Create backup if possible",
+        "Restore from last known good backup",
+        "Replay transaction logs",
+        "Verify data integrity",
+        "Restore application connections"
+    ]
+})
+
+
+# Script scaffolds compiled once at import; per-call work is reduced to
+# substituting the timestamp and command block
+_DIAGNOSIS_TMPL = string.Template("""#!/bin/bash
+# Diagnostic script generated by NEXUS Remediation Agent
+# Generated at: $ts
+
+echo "Starting diagnostic checks..."
+$cmds
+echo "Diagnostic checks complete."
+""")
+
+_MITIGATION_TMPL = string.Template("""#!/bin/bash
+# Mitigation script generated by NEXUS Remediation Agent
+# Generated at: $ts
+
+echo "Starting mitigation actions..."
+$cmds
+echo "Mitigation actions complete."
+""")
+
+_VERIFICATION_TMPL = string.Template("""#!/bin/bash
+# Verification script generated by NEXUS Remediation Agent
+# Generated at: $ts
+
+echo "Starting verification checks..."
+$cmds
+echo "Verification complete."
+""")
+
+_ROLLBACK_TMPL = string.Template("""#!/bin/bash
+# Rollback script generated by NEXUS Remediation Agent
+# Generated at: $ts
+
+echo "Starting rollback procedures..."
+echo "WARNING: This will undo recent changes"
+read -p "Are you sure you want to proceed? (y/N): " -n 1 -r
+echo
+if [[ $$REPLY =~ ^[Yy]$$ ]]; then
+    echo "Executing rollback..."
+    # Add specific rollback commands here
+    echo "Rollback complete."
+else
+    echo "Rollback cancelled."
+fi
+""")
+
+
+@functools.lru_cache(maxsize=512)
+def _render_scripts(script_items: Tuple[Tuple[str, str], ...],
+                    service_name: str, endpoint: str) -> Tuple[Tuple[str, str], ...]:
+    """Render a template's scripts for one (service, endpoint) pairing
+
+    str.format re-parses the template on every call; since most
+    incidents resolve to the same handful of services, caching the
+    rendered set eliminates the parse and substitution entirely on
+    repeat classifications.
+    """
+    return tuple(
+        (script_type, script_template.format(
+            service_name=service_name,
+            deployment=service_name,
+            replicas=3,  # Default scaling
+            endpoint=endpoint,
+            host=endpoint,
+            user='app_user',
+            domain=endpoint,
+            server='localhost'
+        ))
+        for script_type, script_template in script_items
+    )
+
+
+# Resolution-time estimates by severity then incident type
+_RESOLUTION_ESTIMATES = {
+    'critical': {
+        'service_down': '15-30 minutes',
+        'memory_exhaustion': '10-20 minutes',
+        'database_connection': '20-45 minutes',
+        'default': '30-60 minutes'
+    },
+    'high': {
+        'high_cpu': '20-40 minutes',
+        'disk_space': '15-30 minutes',
+        'default': '45-90 minutes'
+    },
+    'medium': {
+        'network_latency': '30-60 minutes',
+        'default': '1-2 hours'
+    },
+    'low': {
+        'default': '2-4 hours'
+    }
+}
+
+# Plan blocks that are identical for every incident; shared by
+# reference, so callers must treat them as read-only
+_ROLLBACK_PLAN = {
+    'triggers': [
+        'Resolution attempts fail after 3 tries',
+        'System state worsens',
+        'New critical issues arise'
+    ],
+    'steps': [
+        'Stop current remediation actions',
+        'Restore previous configuration',
+        'Verify system stability',
+        'Escalate to senior team'
+    ],
+    'time_limit': '30 minutes',
+    'escalation_contacts': [
+        'senior-ops-team@company.com',
+        'infrastructure-lead@company.com'
+    ]
+}
+
+_VERIFICATION_STEPS = [
+    'Check service health endpoints',
+    'Verify metrics have returned to normal',
+    'Test affected functionality manually',
+    'Confirm no new alerts are firing',
+    'Monitor for 15 minutes to ensure stability'
+]
+
+_MONITORING_RECOMMENDATIONS = [
+    'Add alerting for early detection of similar issues',
+    'Implement health checks for affected services',
+    'Set up automated recovery for common scenarios',
+    'Create dashboard for key metrics',
+    'Schedule regular system health reviews'
+]
+
+
+def _immediate_actions(severity: str, template: Dict) -> List[str]:
+    """Build the immediate actions for a severity/template pairing"""
+    actions = []
+
+    if severity == 'critical':
+        actions.append("Page on-call team immediately")
+        actions.append("Start incident war room/bridge")
+
+    actions.append("Acknowledge incident in monitoring system")
+    actions.append("Begin impact assessment")
+
+    # Add template-specific immediate actions
+    template_steps = template.get('steps', [])
+    if template_steps:
+        actions.extend(template_steps[:2])  # First 2 steps as immediate
+
+    return actions
+
+
+def _detailed_steps(template: Dict) -> List[Dict]:
+    """Build the detailed remediation steps for a template"""
+    steps = []
+    scripts = template.get('scripts', {})
+
+    for i, step in enumerate(template.get('steps', []), 1):
+        kind = _step_kind(step)
+        script_key = _SCRIPT_KEY_BY_KIND[kind]
+        if script_key is None:
+            commands = []
+        else:
+            commands = [cmd.strip()
+                        for cmd in scripts.get(script_key, '').split('; ')
+                        if cmd.strip()]
+        steps.append({
+            'step_number': i,
+            'description': step,
+            'estimated_time': _DEFAULT_TIME,
+            'commands': commands,
+            'verification': _VERIFY_BY_KIND[kind],
+            'rollback': _ROLLBACK_BY_KIND[kind]
+        })
+
+    return steps
+
+
+@functools.lru_cache(maxsize=64)
+def _build_plan_skeleton(incident_type: str, severity: str) -> Dict:
+    """Build the incident-invariant portion of a template-based plan
+
+    Everything except the incident id, automation scripts and timestamp
+    depends only on (incident_type, severity), so repeat incidents of
+    the same shape reuse one cached skeleton. Callers merge it into a
+    fresh top-level dict and must treat the nested blocks as read-only.
+    """
+    template = _REMEDIATION_TEMPLATES.get(incident_type, {})
+    estimates = _RESOLUTION_ESTIMATES.get(severity, _RESOLUTION_ESTIMATES['medium'])
+
+    return {
+        'incident_type': incident_type,
+        'priority': template.get('priority', 'medium'),
+        'estimated_resolution_time': estimates.get(incident_type, estimates['default']),
+        'immediate_actions': _immediate_actions(severity, template),
+        'detailed_steps': _detailed_steps(template),
+        'rollback_plan': _ROLLBACK_PLAN,
+        'verification_steps': _VERIFICATION_STEPS,
+        'monitoring_recommendations': _MONITORING_RECOMMENDATIONS,
+        'ai_generated': False
+    }
+
+
 class RemediationAgent(BaseAgent):
     """
     Agent responsible for generating automated remediation plans,
@@ -30,141 +483,16 @@ class RemediationAgent(BaseAgent):
             capabilities=["remediation_planning", "runbook_generation", "automation_scripts"]
         )
         self.bedrock_client = get_bedrock_client()
-        self.remediation_templates = self._load_remediation_templates()
-        self.runbook_library = self._initialize_runbook_library()
-        
+        self.remediation_templates = _REMEDIATION_TEMPLATES
+        self.runbook_library = _RUNBOOK_LIBRARY
+
+        # Pending (incident, future) pairs awaiting batched plan generation
+        self._plan_queue: asyncio.Queue = asyncio.Queue()
+        self._plan_batch_task: Optional[asyncio.Task] = None
+
+
         logger.info(f"Remediation Agent initialized with Bedrock: {self.bedrock_client.is_available()}")
         
-    def _load_remediation_templates(self) -> Dict:
-        """Load predefined remediation templates for common incident types"""
-        return {
-            "high_cpu": {
-                "priority": "high",
-                "steps": [
-                    "Identify processes consuming high CPU",
-                    "Check for runaway processes or memory leaks",
-                    "Scale horizontally if needed",
-                    "Restart affected services if safe",
-                    "Monitor recovery progress"
-                ],
-                "scripts": {
-                    "diagnosis": "top -n 1 | head -20; ps aux --sort=-%cpu | head -10",
-                    "mitigation": "systemctl restart {service_name}",
-                    "scaling": "kubectl scale deployment {deployment} --replicas={replicas}"
-                }
-            },
-            "memory_exhaustion": {
-                "priority": "critical",
-                "steps": [
-                    "Identify memory-consuming processes",
-                    "Check for memory leaks",
-                    "Free up memory by restarting services",
-                    "Scale up memory allocation",
-                    "Implement memory monitoring"
-                ],
-                "scripts": {
-                    "diagnosis": "free -h; ps aux --sort=-%mem | head -10",
-                    "mitigation": "systemctl restart {service_name}",
-                    "cleanup": "echo 3 > /proc/sys/vm/drop_caches"
-                }
-            },
-            "disk_space": {
-                "priority": "high",
-                "steps": [
-                    "Identify large files and directories",
-                    "Clean up temporary files",
-                    "Archive old logs",
-                    "Expand disk space if needed",
-                    "Set up log rotation"
-                ],
-                "scripts": {
-                    "diagnosis": "df -h; du -sh /* | sort -hr | head -10",
-                    "cleanup": "find /tmp -type f -atime +7 -delete",
-                    "log_cleanup": "journalctl --vacuum-time=7d"
-                }
-            },
-            "service_down": {
-                "priority": "critical",
-                "steps": [
-                    "Check service status",
-                    "Review recent logs for errors",
-                    "Attempt service restart",
-                    "Verify dependencies are running",
-                    "Escalate if restart fails"
-                ],
-                "scripts": {
-                    "diagnosis": "systemctl status {service_name}; journalctl -u {service_name} --since '10 minutes ago'",
-                    "mitigation": "systemctl restart {service_name}",
-                    "verification": "systemctl is-active {service_name}"
-                }
-            },
-            "network_latency": {
-                "priority": "medium",
-                "steps": [
-                    "Check network connectivity",
-                    "Test latency to key endpoints",
-                    "Review network configuration",
-                    "Check for network congestion",
-                    "Contact network team if needed"
-                ],
-                "scripts": {
-                    "diagnosis": "ping -c 5 {endpoint}; traceroute {endpoint}",
-                    "bandwidth_test": "iperf3 -c {server} -t 10",
-                    "dns_check": "nslookup {domain}"
-                }
-            },
-            "database_connection": {
-                "priority": "critical",
-                "steps": [
-                    "Check database service status",
-                    "Verify connection pool settings",
-                    "Test database connectivity",
-                    "Review database logs",
-                    "Restart connection pools if needed"
-                ],
-                "scripts": {
-                    "diagnosis": "systemctl status postgresql; netstat -an | grep 5432",
-                    "connection_test": "psql -h {host} -U {user} -c 'SELECT 1;'",
-                    "pool_restart": "systemctl restart pgbouncer"
-                }
-            }
-        }
-    
-    def _initialize_runbook_library(self) -> Dict:
-        """Initialize library of operational runbooks"""
-        return {
-            "incident_response_checklist": [
-                "Acknowledge incident and start timer",
-                "Assemble incident response team",
-                "Establish communication channels",
-                "Begin initial assessment",
-                "Implement immediate mitigation",
-                "Document all actions taken",
-                "Communicate status to stakeholders",
-                "Conduct post-incident review"
-            ],
-            "service_restart_procedure": [
-                "Check service dependencies",
-                "Drain traffic if load balanced",
-                "Stop service gracefully",
-                "Wait for complete shutdown",
-                "Start service",
-                "Verify service health",
-                "Restore traffic routing",
-                "Monitor for stability"
-            ],
-            "database_recovery": [
-                "Assess database state",
-                "Check for corruption",
-                "Stop application connections",
-                "Create backup if possible",
-                "Restore from last known good backup",
-                "Replay transaction logs",
-                "Verify data integrity",
-                "Restore application connections"
-            ]
-        }
-    
     async def process_message(self, message: AgentMessage) -> Optional[AgentMessage]:
         """Process incoming messages for remediation requests"""
         try:
@@ -172,8 +500,15 @@ class RemediationAgent(BaseAgent):
                 # Generate remediation plan for new incident
                 incident_data = message.data.get('incident')
                 if incident_data:
-                    incident = Incident(**incident_data)
-                    remediation_plan = await self.generate_remediation_plan(incident)
+                    # Detected incidents come from our own analyzer, so
+                    # skip re-validating all sixteen fields; the full
+                    # constructor still backfills id/timestamps when the
+                    # payload lacks them
+                    if 'id' in incident_data:
+                        incident = Incident.model_construct(**incident_data)
+                    else:
+                        incident = Incident(**incident_data)
+                    remediation_plan = await self._request_remediation_plan(incident)
                     
                     response = AgentMessage(
                         sender_id=self.agent_id,
@@ -216,32 +551,88 @@ class RemediationAgent(BaseAgent):
             logger.error(f"Error processing message: {e}")
             return None
     
+    async def _request_remediation_plan(self, incident: Incident) -> Dict:
+        """Queue an incident for batched plan generation and await the result
+
+        Bursts of INCIDENT_DETECTED messages coalesce in _plan_batch_loop
+        so their Bedrock calls go out together instead of serially. Falls
+        through to a direct call when the batcher is not running.
+        """
+        if self._plan_batch_task is None or self._plan_batch_task.done():
+            return await self.generate_remediation_plan(incident)
+        future = asyncio.get_running_loop().create_future()
+        self._plan_queue.put_nowait((incident, future))
+        return await future
+
+    async def _plan_batch_loop(self):
+        """Collect pending plan requests and generate them concurrently"""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            item = await self._plan_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + _PLAN_BATCH_WAIT
+            while len(batch) < _PLAN_BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    extra = await asyncio.wait_for(self._plan_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if extra is None:
+                    break
+                batch.append(extra)
+
+            # Keep incidents of the same type adjacent so their prompts
+            # share structure within the batch
+            batch.sort(key=lambda pair: self._classify_incident_type(pair[0]))
+
+            plans = await asyncio.gather(
+                *(self.generate_remediation_plan(incident) for incident, _ in batch),
+                return_exceptions=True
+            )
+            for (_, future), plan in zip(batch, plans):
+                if future.done():
+                    continue
+                if isinstance(plan, Exception):
+                    future.set_exception(plan)
+                else:
+                    future.set_result(plan)
+
     async def generate_remediation_plan(self, incident: Incident) -> Dict:
         """Generate comprehensive remediation plan for an incident using Bedrock AI"""
         logger.info(f"Generating remediation plan for incident {incident.id}")
-        
+
+        # Classify once and stamp once; every builder below receives
+        # both, so all artifacts of one plan carry the same timestamp
+        incident_type = self._classify_incident_type(incident)
+        generated_at = datetime.utcnow().isoformat()
+
         try:
             # Try Bedrock AI-powered remediation plan generation
             if self.bedrock_client.is_available():
                 ai_plan = await self.bedrock_client.generate_remediation_plan(
-                    incident_type=self._classify_incident_type(incident),
+                    incident_type=incident_type,
                     root_cause=incident.description,
                     affected_services=incident.affected_services
                 )
-                
+
                 # Enhance AI plan with template-based details
-                enhanced_plan = await self._enhance_ai_plan_with_templates(incident, ai_plan)
+                enhanced_plan = await self._enhance_ai_plan_with_templates(
+                    incident, incident_type, ai_plan, generated_at)
                 return enhanced_plan
-                
+
         except Exception as e:
             logger.warning(f"Bedrock AI remediation failed, falling back to templates: {e}")
-        
+
         # Fallback to template-based approach
-        return await self._generate_template_based_plan(incident)
-    
-    async def _enhance_ai_plan_with_templates(self, incident: Incident, ai_plan: Dict) -> Dict:
+        return await self._generate_template_based_plan(incident, incident_type, generated_at)
+
+    async def _enhance_ai_plan_with_templates(self, incident: Incident, incident_type: str,
+                                              ai_plan: Dict, generated_at: str) -> Dict:
         """Enhance AI-generated plan with template-based automation scripts"""
-        incident_type = self._classify_incident_type(incident)
         template = self.remediation_templates.get(incident_type, {})
         
         # Merge AI plan with template data
@@ -257,7 +648,7 @@ class RemediationAgent(BaseAgent):
             'verification_steps': ai_plan.get('verification_steps', self._generate_verification_steps(incident)),
             'monitoring_recommendations': ai_plan.get('prevention_measures', self._generate_monitoring_recommendations(incident)),
             'ai_generated': True,
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': generated_at
         }
         
         logger.info(f"Enhanced AI plan with {len(enhanced_plan['detailed_steps'])} steps")
@@ -272,268 +663,95 @@ class RemediationAgent(BaseAgent):
                 formatted_step = {
                     'step_number': i,
                     'description': step,
-                    'estimated_time': '5-10 minutes',
+                    'estimated_time': _DEFAULT_TIME,
                     'commands': [],
-                    'verification': 'Manual verification required',
-                    'rollback': 'Document changes for potential rollback'
+                    'verification': _DEFAULT_VERIFY,
+                    'rollback': _DEFAULT_ROLLBACK
                 }
             elif isinstance(step, dict):
                 formatted_step = {
                     'step_number': i,
                     'description': step.get('action', step.get('description', f'Step {i}')),
-                    'estimated_time': step.get('time_estimate', '5-10 minutes'),
+                    'estimated_time': step.get('time_estimate', _DEFAULT_TIME),
                     'commands': step.get('commands', []),
-                    'verification': step.get('verification', 'Manual verification required'),
-                    'rollback': step.get('rollback', 'Document changes for potential rollback')
+                    'verification': step.get('verification', _DEFAULT_VERIFY),
+                    'rollback': step.get('rollback', _DEFAULT_ROLLBACK)
                 }
             else:
                 formatted_step = {
                     'step_number': i,
                     'description': str(step),
-                    'estimated_time': '5-10 minutes',
+                    'estimated_time': _DEFAULT_TIME,
                     'commands': [],
-                    'verification': 'Manual verification required',
-                    'rollback': 'Document changes for potential rollback'
+                    'verification': _DEFAULT_VERIFY,
+                    'rollback': _DEFAULT_ROLLBACK
                 }
             
             formatted_steps.append(formatted_step)
         
         return formatted_steps
     
-    async def _generate_template_based_plan(self, incident: Incident) -> Dict:
-        """Generate remediation plan using templates (fallback method)"""
-        # Analyze incident type and severity
-        incident_type = self._classify_incident_type(incident)
-        
-        # Get base template
+    async def _generate_template_based_plan(self, incident: Incident, incident_type: str,
+                                            generated_at: str) -> Dict:
+        """Generate remediation plan using templates (fallback method)
+
+        The incident-invariant blocks come from the cached skeleton;
+        only the per-incident fields are computed here.
+        """
         template = self.remediation_templates.get(incident_type, {})
-        
-        # Generate customized plan
+
         plan = {
             'incident_id': incident.id,
-            'incident_type': incident_type,
-            'priority': template.get('priority', 'medium'),
-            'estimated_resolution_time': self._estimate_resolution_time(incident, incident_type),
-            'immediate_actions': self._generate_immediate_actions(incident, template),
-            'detailed_steps': self._generate_detailed_steps(incident, template),
+            **_build_plan_skeleton(incident_type, incident.severity),
             'automation_scripts': self._generate_automation_scripts_for_incident(incident, template),
-            'rollback_plan': self._generate_rollback_plan(incident),
-            'verification_steps': self._generate_verification_steps(incident),
-            'monitoring_recommendations': self._generate_monitoring_recommendations(incident),
-            'ai_generated': False,
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': generated_at
         }
-        
+
         logger.info(f"Generated {len(plan['detailed_steps'])} step template-based remediation plan")
         return plan
     
     def _classify_incident_type(self, incident: Incident) -> str:
         """Classify incident type based on description and context"""
-        description = incident.description.lower()
-        
-        # Simple keyword-based classification
-        if any(keyword in description for keyword in ['cpu', 'processor', 'load']):
-            return 'high_cpu'
-        elif any(keyword in description for keyword in ['memory', 'ram', 'oom']):
-            return 'memory_exhaustion'
-        elif any(keyword in description for keyword in ['disk', 'storage', 'space']):
-            return 'disk_space'
-        elif any(keyword in description for keyword in ['service', 'down', 'unavailable']):
-            return 'service_down'
-        elif any(keyword in description for keyword in ['network', 'latency', 'timeout']):
-            return 'network_latency'
-        elif any(keyword in description for keyword in ['database', 'connection', 'sql']):
-            return 'database_connection'
-        else:
-            return 'general'
+        return _classify_description(incident.description.lower())
     
     def _estimate_resolution_time(self, incident: Incident, incident_type: str) -> str:
         """Estimate resolution time based on incident severity and type"""
-        time_estimates = {
-            'critical': {
-                'service_down': '15-30 minutes',
-                'memory_exhaustion': '10-20 minutes',
-                'database_connection': '20-45 minutes',
-                'default': '30-60 minutes'
-            },
-            'high': {
-                'high_cpu': '20-40 minutes',
-                'disk_space': '15-30 minutes',
-                'default': '45-90 minutes'
-            },
-            'medium': {
-                'network_latency': '30-60 minutes',
-                'default': '1-2 hours'
-            },
-            'low': {
-                'default': '2-4 hours'
-            }
-        }
-        
-        severity_estimates = time_estimates.get(incident.severity, time_estimates['medium'])
-        return severity_estimates.get(incident_type, severity_estimates['default'])
-    
-    def _generate_immediate_actions(self, incident: Incident, template: Dict) -> List[str]:
-        """Generate immediate actions to take"""
-        actions = []
-        
-        if incident.severity == 'critical':
-            actions.append("Page on-call team immediately")
-            actions.append("Start incident war room/bridge")
-        
-        actions.append("Acknowledge incident in monitoring system")
-        actions.append("Begin impact assessment")
-        
-        # Add template-specific immediate actions
-        template_steps = template.get('steps', [])
-        if template_steps:
-            actions.extend(template_steps[:2])  # First 2 steps as immediate
-        
-        return actions
-    
-    def _generate_detailed_steps(self, incident: Incident, template: Dict) -> List[Dict]:
-        """Generate detailed remediation steps"""
-        steps = []
-        template_steps = template.get('steps', [])
-        
-        for i, step in enumerate(template_steps, 1):
-            step_detail = {
-                'step_number': i,
-                'description': step,
-                'estimated_time': '5-10 minutes',
-                'commands': self._get_commands_for_step(step, template),
-                'verification': self._get_verification_for_step(step),
-                'rollback': self._get_rollback_for_step(step)
-            }
-            steps.append(step_detail)
-        
-        return steps
-    
-    def _get_commands_for_step(self, step: str, template: Dict) -> List[str]:
-        """Get shell commands for a remediation step"""
-        scripts = template.get('scripts', {})
-        commands = []
-        
-        step_lower = step.lower()
-        
-        if 'identify' in step_lower or 'check' in step_lower:
-            commands.extend(scripts.get('diagnosis', '').split('; '))
-        elif 'restart' in step_lower:
-            commands.append(scripts.get('mitigation', ''))
-        elif 'scale' in step_lower:
-            commands.append(scripts.get('scaling', ''))
-        elif 'clean' in step_lower:
-            commands.append(scripts.get('cleanup', ''))
-        
-        return [cmd.strip() for cmd in commands if cmd.strip()]
-    
-    def _get_verification_for_step(self, step: str) -> str:
-        """Get verification command for a step"""
-        step_lower = step.lower()
-        
-        if 'restart' in step_lower:
-            return "systemctl is-active {service_name}"
-        elif 'scale' in step_lower:
-            return "kubectl get pods | grep {deployment}"
-        elif 'clean' in step_lower:
-            return "df -h"
-        else:
-            return "echo 'Manual verification required'"
-    
-    def _get_rollback_for_step(self, step: str) -> str:
-        """Get rollback procedure for a step"""
-        step_lower = step.lower()
-        
-        if 'restart' in step_lower:
-            return "Restart can be reversed by stopping service"
-        elif 'scale' in step_lower:
-            return "Scale back to original replica count"
-        elif 'clean' in step_lower:
-            return "Restore from backup if files were critical"
-        else:
-            return "Document changes for potential rollback"
+        estimates = _RESOLUTION_ESTIMATES.get(incident.severity, _RESOLUTION_ESTIMATES['medium'])
+        return estimates.get(incident_type, estimates['default'])
     
     def _generate_automation_scripts_for_incident(self, incident: Incident, template: Dict) -> Dict:
         """Generate automation scripts for the incident"""
         scripts = template.get('scripts', {})
-        
-        # Customize scripts with incident-specific parameters
-        customized_scripts = {}
-        
-        for script_type, script_template in scripts.items():
-            # Extract service name from incident if possible
-            service_name = self._extract_service_name(incident)
-            
-            customized_script = script_template.format(
-                service_name=service_name,
-                deployment=service_name,
-                replicas=3,  # Default scaling
-                endpoint=incident.affected_services[0] if incident.affected_services else 'localhost',
-                host=incident.affected_services[0] if incident.affected_services else 'localhost',
-                user='app_user',
-                domain=incident.affected_services[0] if incident.affected_services else 'localhost',
-                server='localhost'
-            )
-            
-            customized_scripts[script_type] = customized_script
-        
-        return customized_scripts
+        if not scripts:
+            return {}
+
+        # Customize scripts with incident-specific parameters; the
+        # rendering itself is cached per (template, service, endpoint)
+        service_name = self._extract_service_name(incident)
+        endpoint = incident.affected_services[0] if incident.affected_services else 'localhost'
+
+        return dict(_render_scripts(tuple(scripts.items()), service_name, endpoint))
     
     def _extract_service_name(self, incident: Incident) -> str:
         """Extract service name from incident information"""
         if incident.affected_services:
             return incident.affected_services[0]
-        
+
         # Try to extract from description
-        description_words = incident.description.lower().split()
-        common_services = ['nginx', 'apache', 'mysql', 'postgresql', 'redis', 'docker']
-        
-        for word in description_words:
-            if word in common_services:
-                return word
-        
-        return 'unknown-service'
+        match = _SERVICE_RE.search(incident.description.lower())
+        return match.group(1) if match else 'unknown-service'
     
     def _generate_rollback_plan(self, incident: Incident) -> Dict:
         """Generate rollback plan"""
-        return {
-            'triggers': [
-                'Resolution attempts fail after 3 tries',
-                'System state worsens',
-                'New critical issues arise'
-            ],
-            'steps': [
-                'Stop current remediation actions',
-                'Restore previous configuration',
-                'Verify system stability',
-                'Escalate to senior team'
-            ],
-            'time_limit': '30 minutes',
-            'escalation_contacts': [
-                'senior-ops-team@company.com',
-                'infrastructure-lead@company.com'
-            ]
-        }
-    
+        return _ROLLBACK_PLAN
+
     def _generate_verification_steps(self, incident: Incident) -> List[str]:
         """Generate verification steps to confirm resolution"""
-        return [
-            'Check service health endpoints',
-            'Verify metrics have returned to normal',
-            'Test affected functionality manually',
-            'Confirm no new alerts are firing',
-            'Monitor for 15 minutes to ensure stability'
-        ]
-    
+        return _VERIFICATION_STEPS
+
     def _generate_monitoring_recommendations(self, incident: Incident) -> List[str]:
         """Generate recommendations for improved monitoring"""
-        return [
-            'Add alerting for early detection of similar issues',
-            'Implement health checks for affected services',
-            'Set up automated recovery for common scenarios',
-            'Create dashboard for key metrics',
-            'Schedule regular system health reviews'
-        ]
+        return _MONITORING_RECOMMENDATIONS
     
     async def generate_remediation_plan_from_data(self, data: Dict) -> Dict:
         """Generate remediation plan from message data"""
@@ -581,77 +799,37 @@ class RemediationAgent(BaseAgent):
         """Generate automation scripts for specific scenarios"""
         incident_type = data.get('incident_type', 'general')
         template = self.remediation_templates.get(incident_type, {})
-        
+
+        # One timestamp shared by all four scripts of this request
+        ts = datetime.utcnow().isoformat()
+
         scripts = {
-            'diagnosis_script': self._create_diagnosis_script(template),
-            'mitigation_script': self._create_mitigation_script(template),
-            'verification_script': self._create_verification_script(template),
-            'rollback_script': self._create_rollback_script(template)
+            'diagnosis_script': self._create_diagnosis_script(template, ts),
+            'mitigation_script': self._create_mitigation_script(template, ts),
+            'verification_script': self._create_verification_script(template, ts),
+            'rollback_script': self._create_rollback_script(template, ts)
         }
-        
+
         return scripts
-    
-    def _create_diagnosis_script(self, template: Dict) -> str:
+
+    def _create_diagnosis_script(self, template: Dict, ts: str) -> str:
         """Create diagnostic script"""
         diagnosis_commands = template.get('scripts', {}).get('diagnosis', 'echo "No diagnosis script available"')
-        
-        script = f"""#!/bin/bash
-# Diagnostic script generated by NEXUS Remediation Agent
-# Generated at: {datetime.utcnow().isoformat()}
+        return _DIAGNOSIS_TMPL.substitute(ts=ts, cmds=diagnosis_commands)
 
-echo "Starting diagnostic checks..."
-{diagnosis_commands}
-echo "Diagnostic checks complete."
-"""
-        return script
-    
-    def _create_mitigation_script(self, template: Dict) -> str:
+    def _create_mitigation_script(self, template: Dict, ts: str) -> str:
         """Create mitigation script"""
         mitigation_commands = template.get('scripts', {}).get('mitigation', 'echo "No mitigation script available"')
-        
-        script = f"""#!/bin/bash
-# Mitigation script generated by NEXUS Remediation Agent
-# Generated at: {datetime.utcnow().isoformat()}
+        return _MITIGATION_TMPL.substitute(ts=ts, cmds=mitigation_commands)
 
-echo "Starting mitigation actions..."
-{mitigation_commands}
-echo "Mitigation actions complete."
-"""
-        return script
-    
-    def _create_verification_script(self, template: Dict) -> str:
+    def _create_verification_script(self, template: Dict, ts: str) -> str:
         """Create verification script"""
         verification_commands = template.get('scripts', {}).get('verification', 'echo "Manual verification required"')
-        
-        script = f"""#!/bin/bash
-# Verification script generated by NEXUS Remediation Agent
-# Generated at: {datetime.utcnow().isoformat()}
+        return _VERIFICATION_TMPL.substitute(ts=ts, cmds=verification_commands)
 
-echo "Starting verification checks..."
-{verification_commands}
-echo "Verification complete."
-"""
-        return script
-    
-    def _create_rollback_script(self, template: Dict) -> str:
+    def _create_rollback_script(self, template: Dict, ts: str) -> str:
         """Create rollback script"""
-        script = f"""#!/bin/bash
-# Rollback script generated by NEXUS Remediation Agent
-# Generated at: {datetime.utcnow().isoformat()}
-
-echo "Starting rollback procedures..."
-echo "WARNING: This will undo recent changes"
-read -p "Are you sure you want to proceed? (y/N): " -n 1 -r
-echo
-if [[ $REPLY =~ ^[Yy]$ ]]; then
-    echo "Executing rollback..."
-    # Add specific rollback commands here
-    echo "Rollback complete."
-else
-    echo "Rollback cancelled."
-fi
-"""
-        return script
+        return _ROLLBACK_TMPL.substitute(ts=ts)
     
     async def run(self):
         """Main run loop for the Remediation Agent"""
@@ -664,10 +842,16 @@ fi
                 
                 # Send heartbeat
                 await self.send_heartbeat()
-                
-                # Wait before next iteration
-                await asyncio.sleep(5)
-                
+
+                # Sleep until a message arrives or the heartbeat interval
+                # elapses - no fixed polling delay between messages
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._wake.clear()
+
             except Exception as e:
                 logger.error(f"Error in remediation agent run loop: {e}")
                 await asyncio.sleep(10)
@@ -677,14 +861,14 @@ fi
     async def initialize(self):
         """Initialize the remediation agent"""
         logger.info(f"Remediation Agent {self.agent_id} initialized")
-        # Add any initialization logic here
-        pass
-        
+        self._plan_batch_task = asyncio.create_task(self._plan_batch_loop())
+
     async def cleanup(self):
         """Cleanup resources"""
         logger.info(f"Remediation Agent {self.agent_id} cleaning up")
-        # Add any cleanup logic here
-        pass
+        if self._plan_batch_task is not None:
+            self._plan_queue.put_nowait(None)
+            self._plan_batch_task = None
 
 
 async def main():
@@ -706,13 +890,18 @@ async def main():
     # Generate remediation plan
     plan = await agent.generate_remediation_plan(test_incident)
     print("Generated Remediation Plan:")
-    print(json.dumps(plan, indent=2, default=str))
-    
+    print(_dumps(plan))
+
     # Test runbook generation
     runbook = await agent.generate_runbook({'runbook_type': 'service_restart_procedure'})
     print("\nGenerated Runbook:")
-    print(json.dumps(runbook, indent=2, default=str))
+    print(_dumps(runbook))
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # stdlib event loop where uvloop is unavailable
     asyncio.run(main())
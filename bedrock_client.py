@@ -3,16 +3,254 @@ Amazon Bedrock client for NEXUS MVP
 Provides AI/ML capabilities using Amazon Bedrock foundation models
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict, deque
 from typing import Dict, List, Optional, Any
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _loads(data):
+    """Parse JSON bytes/str, orjson when installed, stdlib otherwise"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_bytes(obj) -> bytes:
+    """Serialize a request body to bytes for the Bedrock API"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+# Reused for recovering JSON embedded in conversational responses
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_json_response(response: str):
+    """Parse an LLM response that may wrap JSON in prose
+
+    Models often surround the requested JSON with leading or trailing
+    commentary, which fails a strict parse and used to discard an
+    otherwise valid (and paid-for) response. Try the strict parse
+    first, then recover the first embedded object with raw_decode.
+    Raises ValueError when no JSON object can be found.
+    """
+    try:
+        return _loads(response)
+    except ValueError:
+        start = response.find('{')
+        if start < 0:
+            raise
+        obj, _ = _JSON_DECODER.raw_decode(response, start)
+        return obj
+
+
+def _pack_within_budget(entries: List[str], max_tokens: int = 2048) -> List[str]:
+    """Take leading entries whose estimated token count fits the budget
+
+    Estimates ~4 characters per token. A fixed entry-count cut either
+    overshoots the prompt budget on long lines or drops useful context
+    when lines are short; packing by tokens keeps prompt size - and
+    therefore latency and cost - consistent.
+    """
+    packed = []
+    budget = max_tokens
+    for entry in entries:
+        cost = len(entry) // 4 + 1
+        if cost > budget:
+            break
+        budget -= cost
+        packed.append(entry)
+    return packed
+
+# Exact-prompt response cache bounds: identical deterministic prompts
+# skip the network round-trip for up to an hour
+_CACHE_MAX = 1024
+_CACHE_TTL = 3600.0  # seconds
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Prompt templates built once at import. Each prompt is split into a
+# static instruction prelude (identical on every call, so Bedrock's
+# prompt-prefix cache can reuse it) and a per-call payload appended at
+# the end of the message.
+_LOG_ANALYSIS_PRELUDE = """Analyze the log entries provided at the end of this message for anomalies, errors, and potential incidents.
+
+Please provide analysis in JSON format with:
+1. "anomalies": List of detected anomalies with severity and description
+2. "incidents": List of potential incidents with affected services
+3. "summary": Brief summary of log analysis
+4. "recommendations": Suggested actions
+
+Respond only with valid JSON."""
+
+_LOG_ANALYSIS_PAYLOAD = """Context: {context}
+
+Log Entries:
+{logs}"""
+
+_RCA_PRELUDE = """Perform root cause analysis for the incident described at the end of this message.
+
+Provide analysis in JSON format with:
+1. "root_causes": List of potential root causes with confidence scores (0-1)
+2. "analysis_steps": Step-by-step reasoning process
+3. "contributing_factors": Additional factors that may have contributed
+4. "confidence": Overall confidence in the analysis (0-1)
+
+Respond only with valid JSON."""
+
+_RCA_PAYLOAD = """Incident: {incident}
+
+Evidence:
+{evidence}"""
+
+_REMEDIATION_PRELUDE = """Generate a detailed remediation plan for the incident described at the end of this message.
+
+Provide plan in JSON format with:
+1. "immediate_actions": List of immediate steps to take
+2. "detailed_steps": Detailed remediation steps with time estimates
+3. "rollback_plan": Steps to rollback changes if needed
+4. "verification_steps": How to verify the fix worked
+5. "prevention_measures": How to prevent recurrence
+
+Respond only with valid JSON."""
+
+_REMEDIATION_PAYLOAD = """Incident Type: {incident_type}
+Root Cause: {root_cause}
+Affected Services: {services}"""
+
+_SUMMARY_PRELUDE = """Generate a concise summary of the log entries provided at the end of this message.
+
+Provide a brief 2-3 sentence summary focusing on:
+- Key events that occurred
+- Services affected
+- Severity level
+
+Keep the response concise and factual."""
+
+_SUMMARY_PAYLOAD = """Timeframe: {timeframe}
+
+{logs}"""
+
+# Error signatures the mock analysis recognizes; one compiled
+# case-insensitive alternation scans the joined log text linearly
+# instead of lowercasing it once per pattern
+_MOCK_ERROR_PATTERNS = {
+    "Database connection pool exhausted": {
+        "title": "Database Connection Pool Exhaustion",
+        "description": "Database connection pool exhausted",
+        "severity": "high",
+        "services": ["user-db", "auth-service"]
+    },
+    "Authentication failed": {
+        "title": "Authentication Failures",
+        "description": "Authentication failure for user user_1084",
+        "severity": "medium",
+        "services": ["auth-service"]
+    },
+    "Connection refused": {
+        "title": "Service Connectivity Issues",
+        "description": "Connectivity issues between user-db and auth-service",
+        "severity": "medium",
+        "services": ["user-db", "auth-service"]
+    },
+    "SSL certificate expired": {
+        "title": "SSL Certificate Issues",
+        "description": "SSL certificate expired causing service disruption",
+        "severity": "high",
+        "services": ["user-service"]
+    },
+    "Out of memory": {
+        "title": "Memory Exhaustion",
+        "description": "Out of memory error detected in service",
+        "severity": "high",
+        "services": ["user-service"]
+    }
+}
+_MOCK_PATTERN_RE = re.compile(
+    "|".join(re.escape(pattern) for pattern in _MOCK_ERROR_PATTERNS),
+    re.IGNORECASE
+)
+_MOCK_PATTERN_BY_LOWER = {pattern.lower(): pattern for pattern in _MOCK_ERROR_PATTERNS}
+
+
+class SemanticCache:
+    """Approximate cache for the structured analysis helpers
+
+    Incident prompts are often near-duplicates of each other (same log
+    patterns, slightly different timestamps or hosts), so an exact match
+    rarely fires. This cache compares bag-of-words cosine similarity
+    against previously answered prompts and serves the stored result
+    when the best match clears KNOWLEDGE_BASE's similarity threshold.
+    Returned values are shared by reference and must be treated as
+    read-only.
+    """
+
+    def __init__(self, maxsize: int = 256, threshold: float = None):
+        self.threshold = threshold if threshold is not None \
+            else config.KNOWLEDGE_BASE["similarity_threshold"]
+        # (kind, token counts, vector norm, value) in insertion order
+        self._entries = deque(maxlen=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _vectorize(text: str):
+        counts = Counter(_TOKEN_RE.findall(text.lower()))
+        norm = math.sqrt(sum(c * c for c in counts.values()))
+        return counts, norm
+
+    def get(self, kind: str, text: str) -> Optional[Any]:
+        """Return the best stored value for a similar prompt, or None"""
+        counts, norm = self._vectorize(text)
+        if not norm:
+            return None
+
+        best_score, best_value = 0.0, None
+        for entry_kind, entry_counts, entry_norm, value in self._entries:
+            if entry_kind != kind:
+                continue
+            # Iterate the smaller counter when computing the dot product
+            small, large = counts, entry_counts
+            if len(small) > len(large):
+                small, large = large, small
+            dot = sum(c * large.get(token, 0) for token, c in small.items())
+            score = dot / (norm * entry_norm)
+            if score > best_score:
+                best_score, best_value = score, value
+
+        if best_score >= self.threshold:
+            self.hits += 1
+            return best_value
+        self.misses += 1
+        return None
+
+    def put(self, kind: str, text: str, value: Any):
+        """Store a prompt/result pair, evicting the oldest past maxlen"""
+        counts, norm = self._vectorize(text)
+        if norm:
+            self._entries.append((kind, counts, norm, value))
+
+    def clear(self):
+        self._entries.clear()
+
+
 class BedrockClient:
     """Client for interacting with Amazon Bedrock foundation models"""
     
@@ -22,14 +260,48 @@ class BedrockClient:
         self.max_tokens = config.BEDROCK_CONFIG["max_tokens"]
         self.temperature = config.BEDROCK_CONFIG["temperature"]
         self.top_p = config.BEDROCK_CONFIG["top_p"]
-        
+
+        # Resolved once instead of per call
+        self._fast_model = config.BEDROCK_MODELS["fast"]
+        self._balanced_model = config.BEDROCK_MODELS["balanced"]
+
+        # LRU of digest -> (response, expiry); temperature and top_p are
+        # part of the digest, so changed sampling settings miss naturally
+        self._response_cache: OrderedDict = OrderedDict()
+
+        # Near-duplicate prompt cache shared by the analysis helpers
+        self._semantic_cache = SemanticCache()
+
+        # Skip client construction entirely when no credentials are
+        # configured; mock-only runs (tests, local dev) then avoid the
+        # boto3 import and client setup cost at startup
+        if not (config.AWS_ACCESS_KEY_ID
+                or os.path.exists(os.path.expanduser("~/.aws/credentials"))):
+            logger.warning("No AWS credentials configured. Using mock responses for development.")
+            self.bedrock_client = None
+            return
+
         try:
-            # Initialize Bedrock client
+            # Deferred so mock-only runs never pay for it
+            import boto3
+            from botocore.config import Config
+
+            # Initialize Bedrock client with a pool sized for concurrent
+            # invocations, adaptive retries and keepalive so warm
+            # connections are reused across calls
+            client_config = Config(
+                max_pool_connections=config.BEDROCK_CONFIG.get("max_pool_connections", 64),
+                retries={"max_attempts": 3, "mode": "adaptive"},
+                connect_timeout=3,
+                read_timeout=60,
+                tcp_keepalive=True
+            )
             self.bedrock_client = boto3.client(
                 service_name='bedrock-runtime',
                 region_name=self.region,
                 aws_access_key_id=config.AWS_ACCESS_KEY_ID if config.AWS_ACCESS_KEY_ID else None,
-                aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY if config.AWS_SECRET_ACCESS_KEY else None
+                aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY if config.AWS_SECRET_ACCESS_KEY else None,
+                config=client_config
             )
             
             logger.info(f"Initialized Bedrock client for region {self.region}")
@@ -44,54 +316,117 @@ class BedrockClient:
     def is_available(self) -> bool:
         """Check if Bedrock client is available"""
         return self.bedrock_client is not None
-    
-    async def generate_text(self, prompt: str, model: str = None, max_tokens: int = None) -> Optional[str]:
-        """Generate text using Bedrock foundation model"""
+
+    def _cache_key(self, model_id: str, tokens: int, prompt: str) -> bytes:
+        """Digest of everything that influences the model output"""
+        return hashlib.blake2b(
+            f"{model_id}|{tokens}|{self.temperature}|{self.top_p}|{prompt}".encode(),
+            digest_size=16
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[str]:
+        """Return the cached response for key, or None if absent/expired"""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        text, expires = entry
+        if time.monotonic() >= expires:
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return text
+
+    def _cache_put(self, key: bytes, text: str):
+        """Store a successful response, evicting the oldest past the cap"""
+        cache = self._response_cache
+        cache[key] = (text, time.monotonic() + _CACHE_TTL)
+        cache.move_to_end(key)
+        while len(cache) > _CACHE_MAX:
+            cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop all cached responses"""
+        self._response_cache.clear()
+
+    def _build_request_body(self, model_id: str, tokens: int, prompt: str,
+                            static_prefix: str = None) -> Dict[str, Any]:
+        """Build the model-specific request body for an invocation"""
+        if "anthropic.claude" in model_id:
+            if static_prefix:
+                content = [
+                    {"type": "text", "text": static_prefix,
+                     "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": prompt}
+                ]
+            else:
+                content = prompt
+            return {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": tokens,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": content
+                    }
+                ]
+            }
+        # Generic format for other models
+        prompt = f"{static_prefix}\n\n{prompt}" if static_prefix else prompt
+        return {
+            "prompt": prompt,
+            "max_tokens": tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p
+        }
+
+    async def generate_text(self, prompt: str, model: str = None, max_tokens: int = None,
+                            static_prefix: str = None) -> Optional[str]:
+        """Generate text using Bedrock foundation model
+
+        static_prefix, when given, is an instruction block that is
+        identical across calls; it is sent as a separate content block
+        marked ephemeral so Bedrock's prompt-prefix cache can reuse it.
+        """
+        full_prompt = f"{static_prefix}\n\n{prompt}" if static_prefix else prompt
         if not self.is_available():
-            return self._mock_response(prompt)
-        
+            return self._mock_response(full_prompt)
+
         try:
             model_id = model or self.model_id
             tokens = max_tokens or self.max_tokens
-            
-            # Prepare request based on model type
-            if "anthropic.claude" in model_id:
-                body = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": tokens,
-                    "temperature": self.temperature,
-                    "top_p": self.top_p,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                }
-            else:
-                # Generic format for other models
-                body = {
-                    "prompt": prompt,
-                    "max_tokens": tokens,
-                    "temperature": self.temperature,
-                    "top_p": self.top_p
-                }
-            
-            # Make request to Bedrock
-            response = self.bedrock_client.invoke_model(
+
+            # Serve repeated prompts from the cache: within the TTL a
+            # repeat gets the same (possibly sampled) answer back
+            cache_key = self._cache_key(model_id, tokens, full_prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            body = self._build_request_body(model_id, tokens, prompt, static_prefix)
+
+            # Make request to Bedrock off the event loop so concurrent
+            # invocations overlap instead of serializing behind the
+            # blocking boto3 call; the client is thread-safe
+            response = await asyncio.to_thread(
+                self.bedrock_client.invoke_model,
                 modelId=model_id,
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(body)
+                body=_dumps_bytes(body)
             )
-            
+
             # Parse response
-            response_body = json.loads(response['body'].read())
+            response_body = _loads(response['body'].read())
             
             if "anthropic.claude" in model_id:
-                return response_body['content'][0]['text']
+                result = response_body['content'][0]['text']
             else:
-                return response_body.get('completion', response_body.get('text', ''))
+                result = response_body.get('completion', response_body.get('text', ''))
+
+            self._cache_put(cache_key, result)
+            return result
                 
         except ClientError as e:
             logger.error(f"AWS ClientError in generate_text: {e}")
@@ -99,104 +434,162 @@ class BedrockClient:
         except Exception as e:
             logger.error(f"Error generating text with Bedrock: {e}")
             return self._mock_response(prompt)
-    
+
+    async def stream_text(self, prompt: str, model: str = None, max_tokens: int = None,
+                          static_prefix: str = None):
+        """Yield response text chunks as Bedrock generates them
+
+        Uses invoke_model_with_response_stream so callers see the first
+        tokens as soon as the model emits them instead of waiting for
+        the full body. Mock mode and failures degrade to a single
+        chunk, so callers can always just join the pieces.
+        """
+        if not self.is_available():
+            yield self._mock_response(
+                f"{static_prefix}\n\n{prompt}" if static_prefix else prompt)
+            return
+
+        try:
+            model_id = model or self.model_id
+            tokens = max_tokens or self.max_tokens
+            body = self._build_request_body(model_id, tokens, prompt, static_prefix)
+
+            response = await asyncio.to_thread(
+                self.bedrock_client.invoke_model_with_response_stream,
+                modelId=model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=_dumps_bytes(body)
+            )
+
+            # The event stream blocks between chunks, so pull each event
+            # on a worker thread to keep the loop responsive
+            events = iter(response['body'])
+            while True:
+                event = await asyncio.to_thread(next, events, None)
+                if event is None:
+                    break
+                chunk = _loads(event['chunk']['bytes'])
+                if chunk.get('type') == 'content_block_delta':
+                    text = chunk['delta'].get('text', '')
+                else:
+                    text = chunk.get('completion', chunk.get('text', ''))
+                if text:
+                    yield text
+
+        except ClientError as e:
+            logger.error(f"AWS ClientError in stream_text: {e}")
+            yield self._mock_response(prompt)
+        except Exception as e:
+            logger.error(f"Error streaming text with Bedrock: {e}")
+            yield self._mock_response(prompt)
+
     async def analyze_logs(self, log_entries: List[str], context: str = "") -> Dict[str, Any]:
         """Analyze log entries for anomalies and incidents"""
-        prompt = f"""
-        Analyze the following log entries for anomalies, errors, and potential incidents:
-
-        Context: {context}
+        # Sorted so minor reordering of the same entries still hits the
+        # prompt caches; entries lead with timestamps, so this keeps
+        # them chronological
+        prompt = _LOG_ANALYSIS_PAYLOAD.format(
+            context=context,
+            logs="\n".join(sorted(_pack_within_budget(log_entries)))
+        )
 
-        Log Entries:
-        {chr(10).join(log_entries[:20])}  # Limit to first 20 entries
+        cached = self._semantic_cache.get('logs', prompt)
+        if cached is not None:
+            return cached
 
-        Please provide analysis in JSON format with:
-        1. "anomalies": List of detected anomalies with severity and description
-        2. "incidents": List of potential incidents with affected services
-        3. "summary": Brief summary of log analysis
-        4. "recommendations": Suggested actions
+        response = await self.generate_text(prompt, model=self._fast_model,
+                                            static_prefix=_LOG_ANALYSIS_PRELUDE)
 
-        Respond only with valid JSON.
-        """
-        
-        response = await self.generate_text(prompt, model=config.BEDROCK_MODELS["fast"])
-        
         try:
-            return json.loads(response) if response else self._mock_log_analysis(log_entries)
-        except json.JSONDecodeError:
+            result = _parse_json_response(response) if response else self._mock_log_analysis(log_entries)
+        except ValueError:
             logger.warning("Failed to parse JSON response from Bedrock")
             return self._mock_log_analysis(log_entries)
+
+        if self.is_available():
+            self._semantic_cache.put('logs', prompt, result)
+        return result
     
     async def perform_root_cause_analysis(self, incident_description: str, evidence: List[str]) -> Dict[str, Any]:
         """Perform root cause analysis for an incident"""
-        prompt = f"""
-        Perform root cause analysis for the following incident:
-
-        Incident: {incident_description}
+        prompt = _RCA_PAYLOAD.format(
+            incident=incident_description,
+            evidence="\n".join(evidence)
+        )
 
-        Evidence:
-        {chr(10).join(evidence)}
+        cached = self._semantic_cache.get('rca', prompt)
+        if cached is not None:
+            return cached
 
-        Provide analysis in JSON format with:
-        1. "root_causes": List of potential root causes with confidence scores (0-1)
-        2. "analysis_steps": Step-by-step reasoning process
-        3. "contributing_factors": Additional factors that may have contributed
-        4. "confidence": Overall confidence in the analysis (0-1)
+        response = await self.generate_text(prompt, model=self._balanced_model,
+                                            static_prefix=_RCA_PRELUDE)
 
-        Respond only with valid JSON.
-        """
-        
-        response = await self.generate_text(prompt, model=config.BEDROCK_MODELS["balanced"])
-        
         try:
-            return json.loads(response) if response else self._mock_root_cause_analysis()
-        except json.JSONDecodeError:
+            result = _parse_json_response(response) if response else self._mock_root_cause_analysis()
+        except ValueError:
             logger.warning("Failed to parse JSON response from Bedrock")
             return self._mock_root_cause_analysis()
+
+        if self.is_available():
+            self._semantic_cache.put('rca', prompt, result)
+        return result
     
     async def generate_remediation_plan(self, incident_type: str, root_cause: str, affected_services: List[str]) -> Dict[str, Any]:
         """Generate remediation plan for an incident"""
-        prompt = f"""
-        Generate a detailed remediation plan for the following incident:
+        prompt = _REMEDIATION_PAYLOAD.format(
+            incident_type=incident_type,
+            root_cause=root_cause,
+            services=", ".join(affected_services)
+        )
 
-        Incident Type: {incident_type}
-        Root Cause: {root_cause}
-        Affected Services: {', '.join(affected_services)}
+        cached = self._semantic_cache.get('plan', prompt)
+        if cached is not None:
+            return cached
 
-        Provide plan in JSON format with:
-        1. "immediate_actions": List of immediate steps to take
-        2. "detailed_steps": Detailed remediation steps with time estimates
-        3. "rollback_plan": Steps to rollback changes if needed
-        4. "verification_steps": How to verify the fix worked
-        5. "prevention_measures": How to prevent recurrence
+        response = await self.generate_text(prompt, model=self._balanced_model,
+                                            static_prefix=_REMEDIATION_PRELUDE)
 
-        Respond only with valid JSON.
-        """
-        
-        response = await self.generate_text(prompt, model=config.BEDROCK_MODELS["balanced"])
-        
         try:
-            return json.loads(response) if response else self._mock_remediation_plan()
-        except json.JSONDecodeError:
+            result = _parse_json_response(response) if response else self._mock_remediation_plan()
+        except ValueError:
             logger.warning("Failed to parse JSON response from Bedrock")
             return self._mock_remediation_plan()
+
+        if self.is_available():
+            self._semantic_cache.put('plan', prompt, result)
+        return result
     
-    async def generate_incident_summary(self, log_entries: List[str], timeframe: str) -> str:
-        """Generate a concise incident summary"""
-        prompt = f"""
-        Generate a concise summary of the following log entries from {timeframe}:
+    async def analyze_incident_bundle(self, log_entries: List[str], incident_description: str,
+                                      evidence: List[str], incident_type: str, root_cause: str,
+                                      affected_services: List[str], context: str = "") -> List[Dict[str, Any]]:
+        """Run the three analysis prompts for one incident concurrently
 
-        {chr(10).join(log_entries[:15])}
+        Log analysis, root cause analysis and remediation planning are
+        independent for a given incident, so issuing them together
+        completes in roughly the slowest round-trip instead of their
+        sum. Returns [log_analysis, root_cause_analysis, plan].
+        """
+        return await asyncio.gather(
+            self.analyze_logs(log_entries, context),
+            self.perform_root_cause_analysis(incident_description, evidence),
+            self.generate_remediation_plan(incident_type, root_cause, affected_services)
+        )
 
-        Provide a brief 2-3 sentence summary focusing on:
-        - Key events that occurred
-        - Services affected
-        - Severity level
+    async def generate_incident_summary(self, log_entries: List[str], timeframe: str) -> str:
+        """Generate a concise incident summary"""
+        prompt = _SUMMARY_PAYLOAD.format(
+            timeframe=timeframe,
+            logs="\n".join(_pack_within_budget(log_entries, max_tokens=1024))
+        )
 
-        Keep the response concise and factual.
-        """
-        
-        response = await self.generate_text(prompt, model=config.BEDROCK_MODELS["fast"])
+        # Stream the summary so the first sentence arrives without
+        # waiting for the full generation
+        parts = []
+        async for chunk in self.stream_text(prompt, model=self._fast_model,
+                                            static_prefix=_SUMMARY_PRELUDE):
+            parts.append(chunk)
+        response = "".join(parts)
         return response or f"Log analysis summary for {timeframe}: Multiple service events detected requiring investigation."
     
     def _mock_response(self, prompt: str) -> str:
@@ -230,53 +623,26 @@ class BedrockClient:
     def _mock_log_analysis(self, log_text: List[str] = None) -> Dict[str, Any]:
         """Mock log analysis response - now enhanced to create incidents based on actual log content"""
         incidents = []
-        
+
         # If we have actual log text, create specific incidents based on content
         if log_text:
-            error_patterns = {
-                "Database connection pool exhausted": {
-                    "title": "Database Connection Pool Exhaustion",
-                    "description": "Database connection pool exhausted",
-                    "severity": "high",
-                    "services": ["user-db", "auth-service"]
-                },
-                "Authentication failed": {
-                    "title": "Authentication Failures",
-                    "description": "Authentication failure for user user_1084",
-                    "severity": "medium", 
-                    "services": ["auth-service"]
-                },
-                "Connection refused": {
-                    "title": "Service Connectivity Issues", 
-                    "description": "Connectivity issues between user-db and auth-service",
-                    "severity": "medium",
-                    "services": ["user-db", "auth-service"]
-                },
-                "SSL certificate expired": {
-                    "title": "SSL Certificate Issues",
-                    "description": "SSL certificate expired causing service disruption",
-                    "severity": "high",
-                    "services": ["user-service"]
-                },
-                "Out of memory": {
-                    "title": "Memory Exhaustion",
-                    "description": "Out of memory error detected in service",
-                    "severity": "high", 
-                    "services": ["user-service"]
-                }
-            }
-            
-            # Check for error patterns in the log text
-            log_content = " ".join(log_text) if log_text else ""
-            for pattern, incident_template in error_patterns.items():
-                if pattern.lower() in log_content.lower():
-                    incidents.append({
-                        "title": incident_template["title"],
-                        "description": incident_template["description"],
-                        "severity": incident_template["severity"],
-                        "affected_services": incident_template["services"],
-                        "confidence": 0.8
-                    })
+            # One linear scan over the joined text finds every known
+            # pattern; dedupe so repeated errors yield one incident
+            log_content = " ".join(log_text)
+            seen = set()
+            for match in _MOCK_PATTERN_RE.finditer(log_content):
+                pattern = _MOCK_PATTERN_BY_LOWER[match.group().lower()]
+                if pattern in seen:
+                    continue
+                seen.add(pattern)
+                incident_template = _MOCK_ERROR_PATTERNS[pattern]
+                incidents.append({
+                    "title": incident_template["title"],
+                    "description": incident_template["description"],
+                    "severity": incident_template["severity"],
+                    "affected_services": incident_template["services"],
+                    "confidence": 0.8
+                })
         
         # Add default incident if no specific patterns found
         if not incidents:
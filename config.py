@@ -2,6 +2,7 @@
 Configuration settings for NEXUS MVP
 """
 import os
+from functools import lru_cache
 from typing import Dict, Any
 
 # Application settings
@@ -31,7 +32,8 @@ BEDROCK_CONFIG = {
     "max_tokens": 1000,
     "temperature": 0.3,
     "top_p": 0.9,
-    "region": AWS_REGION
+    "region": AWS_REGION,
+    "max_pool_connections": 64  # HTTP connection pool for concurrent calls
 }
 
 # Alternative models for different use cases
@@ -65,7 +67,8 @@ AGENT_CONFIG = {
     "heartbeat_interval": 30,  # seconds
     "max_retries": 3,
     "timeout": 60,  # seconds
-    "log_level": "INFO"
+    "log_level": "INFO",
+    "max_concurrent_bedrock": 4  # Concurrent model calls per agent
 }
 
 # MCP protocol settings
@@ -162,6 +165,46 @@ SERVICE_TOPOLOGY = {
     }
 }
 
+# Criticality encoding used by the topology index
+CRITICALITY_CODES = {"low": 0, "medium": 1, "high": 2}
+
+
+@lru_cache(maxsize=None)
+def build_topology_index():
+    """Build an integer-indexed adjacency view of SERVICE_TOPOLOGY
+
+    Traversals (blast-radius walks, criticality scans) that repeatedly
+    chase dict-of-dicts lookups can instead work on integer service ids:
+    the neighbours of service i are ``indices[indptr[i]:indptr[i + 1]]``
+    (compressed sparse row layout). Built once and cached.
+
+    Returns (names, name_to_idx, dep_indptr, dep_indices,
+    dependent_indptr, dependent_indices, criticality_codes), all tuples
+    except the name_to_idx dict.
+    """
+    names = tuple(SERVICE_TOPOLOGY)
+    name_to_idx = {name: i for i, name in enumerate(names)}
+
+    def csr(key):
+        indptr = [0]
+        indices = []
+        for name in names:
+            # Neighbours outside the topology are skipped rather than indexed
+            indices.extend(name_to_idx[n] for n in SERVICE_TOPOLOGY[name][key]
+                           if n in name_to_idx)
+            indptr.append(len(indices))
+        return tuple(indptr), tuple(indices)
+
+    dep_indptr, dep_indices = csr("dependencies")
+    dependent_indptr, dependent_indices = csr("dependents")
+    criticality_codes = tuple(
+        CRITICALITY_CODES[SERVICE_TOPOLOGY[name]["criticality"]] for name in names
+    )
+
+    return (names, name_to_idx, dep_indptr, dep_indices,
+            dependent_indptr, dependent_indices, criticality_codes)
+
+
 # Common incident patterns for simulation
 INCIDENT_PATTERNS = {
     "database_connection_timeout": {
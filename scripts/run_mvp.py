@@ -281,4 +281,9 @@ async def main():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # stdlib event loop where uvloop is unavailable
     asyncio.run(main())